@@ -10,15 +10,13 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import plotly.express as px
 import plotly.graph_objects as go
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+# Load the data from the Parquet cache of the CSV file
+data = dataset.load(["OBJECTID", "DISCOVERY_TS", "LATITUDE", "LONGITUDE"])
 
-# Convert the date column to datetime format
-data['DISCOVERY_DATE'] = pd.to_datetime(data['DISCOVERY_DATE'], unit='D', origin='julian')
-
-# Set the datetime column as the index
-data.set_index('DISCOVERY_DATE', inplace=True)
+# Set the discovery timestamp (already converted from Julian days in the cache) as the index
+data.set_index('DISCOVERY_TS', inplace=True)
 
 # Create a directory to store the images if it doesn't exist
 if not os.path.exists("images"):
@@ -56,9 +54,10 @@ X = data[['LATITUDE', 'LONGITUDE']]
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
 
-# Apply DBSCAN clustering
-dbscan = DBSCAN(eps=0.1, min_samples=10)
-data['Cluster'] = dbscan.fit_predict(X_scaled)
+# Apply DBSCAN clustering on great-circle distances (eps in km, converted to radians)
+eps_km = 10
+dbscan = DBSCAN(eps=eps_km / 6371.0088, min_samples=10, metric='haversine', algorithm='ball_tree')
+data['Cluster'] = dbscan.fit_predict(np.radians(X))
 
 # Visualization 3: Principal Component Analysis (PCA) for Dimensionality Reduction
 pca = PCA(n_components=2)
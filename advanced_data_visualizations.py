@@ -1,73 +1,84 @@
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 import folium
-from statsmodels.tsa.seasonal import seasonal_decompose
-
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
-
-# Convert the date column to datetime format
-data['DISCOVERY_DATE'] = pd.to_datetime(data['DISCOVERY_DATE'], unit='D', origin='julian')
-
-# Set the datetime column as the index
-data.set_index('DISCOVERY_DATE', inplace=True)
-
-# Create a directory to store the images if it doesn't exist
-if not os.path.exists("images"):
-    os.makedirs("images")
-
-# Visualization 1: Geospatial Heatmap of Fire Incidents
-m = folium.Map(location=[data['LATITUDE'].mean(), data['LONGITUDE'].mean()], zoom_start=5)
-heat_data = [[row['LATITUDE'], row['LONGITUDE']] for index, row in data.iterrows()]
-
-# Create a heatmap with time
 from folium.plugins import HeatMapWithTime
-HeatMapWithTime(heat_data).add_to(m)
-
-# Save the interactive map as an HTML file
-m.save("images/geospatial_heatmap.html")
-
-# Visualization 2: Time Series Decomposition of Fire Incidents
-time_series = data.resample('Y')['OBJECTID'].count()
-decomposition = seasonal_decompose(time_series, model='additive', period=1)  # Assuming annual data, period=1
-
-plt.figure(figsize=(12, 8))
-plt.subplot(411)
-plt.plot(time_series, label='Original')
-plt.legend(loc='upper left')
-plt.subplot(412)
-plt.plot(decomposition.trend, label='Trend')
-plt.legend(loc='upper left')
-plt.subplot(413)
-plt.plot(decomposition.seasonal, label='Seasonal')
-plt.legend(loc='upper left')
-plt.subplot(414)
-plt.plot(decomposition.resid, label='Residual')
-plt.legend(loc='upper left')
-plt.tight_layout()
-plt.savefig("images/time_series_decomposition.png")
+from statsmodels.tsa.seasonal import seasonal_decompose
+import dataset
+from correlation_heatmap import correlation_matrix, plot_correlation_heatmap
+from time_series_fires import fires_by_year_size, plot_time_series_fires
 
-# Visualization 3: Heatmap of Correlation Matrix
-numeric_columns = data.select_dtypes(include='number')
-correlation_matrix = numeric_columns.corr()
+# Aggregate fires into 0.1 degree cells per year, so the map carries one weighted point per cell
+def heat_cells(data, grid_size=0.1):
+    cells = pd.DataFrame({
+        'year': data['FIRE_YEAR'].values,
+        'lat': (data['LATITUDE'].values // grid_size) * grid_size + grid_size / 2,
+        'lon': (data['LONGITUDE'].values // grid_size) * grid_size + grid_size / 2
+    }).groupby(['year', 'lat', 'lon']).size().rename('fires').reset_index()
+    cells['weight'] = cells['fires'] / cells['fires'].max()
+    return cells
 
-plt.figure(figsize=(12, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', linewidths=0.5)
-plt.title("Correlation Heatmap")
-plt.savefig("images/correlation_heatmap.png")
+def plot_geospatial_heatmap(heat_cells, center, path="images/geospatial_heatmap.html"):
+    # Visualization 1: Geospatial Heatmap of Fire Incidents
+    m = folium.Map(location=list(center), zoom_start=5)
+    
+    years = sorted(heat_cells['year'].unique())
+    heat_data = [
+        heat_cells.loc[heat_cells['year'] == year, ['lat', 'lon', 'weight']].values.tolist()
+        for year in years
+    ]
+    
+    # Create a heatmap with time
+    HeatMapWithTime(heat_data, index=[str(year) for year in years]).add_to(m)
+    
+    # Save the interactive map as an HTML file
+    m.save(path)
 
-# Visualization 4: Time Series of Fires Over the Years by Size Class
-fires_by_year_size = data.groupby([data.index.year, 'FIRE_SIZE_CLASS'])['OBJECTID'].count().unstack().fillna(0)
+# Count fires per year of discovery, indexed by year end like resample('Y') but without sorting every row
+def yearly_counts(data):
+    discovery_year = data['DISCOVERY_TS'].dt.year
+    counts = data['OBJECTID'].groupby(discovery_year).count()
+    years = range(int(counts.index.min()), int(counts.index.max()) + 1)
+    counts = counts.reindex(years, fill_value=0)
+    counts.index = pd.date_range(f"{years[0]}-12-31", periods=len(years), freq=pd.offsets.YearEnd())
+    return counts
 
-plt.figure(figsize=(12, 6))
-fires_by_year_size.plot(ax=plt.gca())
-plt.xlabel("Year")
-plt.ylabel("Number of Fires")
-plt.title("Time Series of Fires Over the Years by Size Class")
-plt.legend(title="Size Class")
-plt.savefig("images/time_series_fires.png")
+def plot_time_series_decomposition(time_series, path="images/time_series_decomposition.png"):
+    # Visualization 2: Time Series Decomposition of Fire Incidents
+    decomposition = seasonal_decompose(time_series, model='additive', period=1)  # Assuming annual data, period=1
+    
+    plt.figure(figsize=(12, 8))
+    plt.subplot(411)
+    plt.plot(time_series, label='Original')
+    plt.legend(loc='upper left')
+    plt.subplot(412)
+    plt.plot(decomposition.trend, label='Trend')
+    plt.legend(loc='upper left')
+    plt.subplot(413)
+    plt.plot(decomposition.seasonal, label='Seasonal')
+    plt.legend(loc='upper left')
+    plt.subplot(414)
+    plt.plot(decomposition.resid, label='Residual')
+    plt.legend(loc='upper left')
+    plt.tight_layout()
+    plt.savefig(path)
 
-# Save the images to the "images" folder
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(dataset.numeric_columns() + ["DISCOVERY_TS", "FIRE_SIZE_CLASS"])
+    
+    # Create a directory to store the images if it doesn't exist
+    if not os.path.exists("images"):
+        os.makedirs("images")
+    
+    plot_geospatial_heatmap(heat_cells(data), (data['LATITUDE'].mean(), data['LONGITUDE'].mean()))
+    plot_time_series_decomposition(yearly_counts(data))
+    
+    # Visualization 3: Heatmap of Correlation Matrix
+    plot_correlation_heatmap(correlation_matrix(data))
+    
+    # Visualization 4: Time Series of Fires Over the Years by Size Class
+    plot_time_series_fires(fires_by_year_size(data))
+    
+    # Save the images to the "images" folder
+    plt.show()
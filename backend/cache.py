@@ -0,0 +1,139 @@
+import hashlib
+import struct
+import time
+import uuid
+from functools import wraps
+
+import orjson
+import zstandard
+from flask import request, Response
+
+DATASET_VERSION_KEY = 'dataset:version'
+
+# flags, created_at (epoch seconds), dataset version stamp
+ENTRY_HEADER = struct.Struct('>BdQ')
+FLAG_ZSTD = 1
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class CacheEntry:
+    def __init__(self, body, created_at, version):
+        self.body = body
+        self.created_at = created_at
+        self.version = version
+
+    def is_fresh(self, ttl, version):
+        return self.version == version and time.time() - self.created_at < ttl
+
+class ResponseCache:
+    def __init__(self, redis_client, prefix='cache', stale_ttl=600, lock_timeout=120,
+                 wait_timeout=30, compress_threshold=16 * 1024, compression_level=3):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def dataset_version(self):
+        return int(self.redis.get(DATASET_VERSION_KEY) or 0)
+
+    def bump_dataset_version(self):
+        return self.redis.incr(DATASET_VERSION_KEY)
+
+    def cache_key(self, namespace, params, version):
+        normalized = sorted(
+            (str(name), sorted(str(value) for value in values))
+            for name, values in params.items()
+        )
+        digest = hashlib.sha1(orjson.dumps(normalized)).hexdigest()
+        return f"{self.prefix}:{namespace}:v{version}:{digest}"
+
+    def encode(self, body, version):
+        flags = 0
+        if len(body) >= self.compress_threshold:
+            body = zstandard.ZstdCompressor(level=self.compression_level).compress(body)
+            flags |= FLAG_ZSTD
+        return ENTRY_HEADER.pack(flags, time.time(), version) + body
+
+    def decode(self, raw):
+        flags, created_at, version = ENTRY_HEADER.unpack_from(raw)
+        body = raw[ENTRY_HEADER.size:]
+        if flags & FLAG_ZSTD:
+            body = zstandard.ZstdDecompressor().decompress(body)
+        return CacheEntry(body, created_at, version)
+
+    def load(self, key):
+        raw = self.redis.get(key)
+        if raw is None:
+            return None
+        try:
+            return self.decode(raw)
+        except (struct.error, zstandard.ZstdError):
+            return None
+
+    def store(self, key, payload, ttl, version):
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        self.redis.set(key, self.encode(body, version), ex=ttl + self.stale_ttl)
+        return body
+
+    def compute_and_store(self, key, ttl, version, compute):
+        payload = compute()
+        if not isinstance(payload, (dict, list)):
+            return payload
+        return self.store(key, payload, ttl, version)
+
+    def get_or_compute(self, namespace, params, ttl, compute):
+        version = self.dataset_version()
+        key = self.cache_key(namespace, params, version)
+        entry = self.load(key)
+
+        if entry is not None and entry.is_fresh(ttl, version):
+            return entry.body
+
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+
+        if self.redis.set(lock_key, token, nx=True, px=self.lock_timeout * 1000):
+            try:
+                return self.compute_and_store(key, ttl, version, compute)
+            finally:
+                self._release_lock(keys=[lock_key], args=[token])
+
+        # Another instance is recomputing this key: serve the stale copy meanwhile
+        if entry is not None:
+            return entry.body
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.load(key)
+            if entry is not None and entry.version == version:
+                return entry.body
+            if not self.redis.exists(lock_key):
+                break
+
+        return self.compute_and_store(key, ttl, version, compute)
+
+    def respond(self, namespace, params, ttl, compute):
+        result = self.get_or_compute(namespace, params, ttl, compute)
+        if isinstance(result, bytes):
+            return Response(result, mimetype='application/json')
+        return result
+
+    def cached(self, namespace, ttl):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                params = request.args.to_dict(flat=False)
+                params.update({f"_{name}": [value] for name, value in kwargs.items()})
+                return self.respond(namespace, params, ttl, lambda: view(*args, **kwargs))
+            return wrapper
+        return decorator
@@ -0,0 +1,83 @@
+import csv
+import io
+
+import orjson
+import pyarrow as pa
+from sqlalchemy import Float, type_coerce
+
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('fire_name', pa.string()),
+    ('discovery_date', pa.date32()),
+    ('fire_year', pa.int32()),
+    ('fire_size_acres', pa.float64()),
+    ('fire_size_class', pa.string()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('state', pa.string()),
+    ('county', pa.string()),
+    ('cause_description', pa.string()),
+    ('reporting_agency', pa.string())
+])
+
+EXPORT_FIELDS = EXPORT_SCHEMA.names
+
+def export_columns(table):
+    # Same fields as serialize_fire(); DECIMAL columns come back as float so every encoder takes them as-is
+    return [
+        type_coerce(table[field.name], Float).label(field.name) if pa.types.is_floating(field.type) else table[field.name]
+        for field in EXPORT_SCHEMA
+    ]
+
+def stream_rows(sources, chunksize=EXPORT_CHUNK_ROWS):
+    # sources are (engine, statement) pairs read one after another, each through a server-side cursor;
+    # yields lists of row tuples so memory stays at one chunk whatever the export size
+    for engine, statement in sources:
+        with engine.connect().execution_options(stream_results=True, yield_per=chunksize) as conn:
+            for rows in conn.execute(statement).partitions():
+                yield rows
+
+def drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+def ndjson_stream(chunks):
+    for rows in chunks:
+        yield b''.join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The header goes out before the first query returns
+    writer.writerow(EXPORT_FIELDS)
+    yield drain(buffer).encode()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield drain(buffer).encode()
+
+def arrow_stream(chunks):
+    # Arrow IPC stream format: the schema message first, then one record batch per chunk
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, EXPORT_SCHEMA) as writer:
+        yield drain(buffer)
+        for rows in chunks:
+            columns = zip(*rows)
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, EXPORT_SCHEMA)],
+                schema=EXPORT_SCHEMA
+            ))
+            yield drain(buffer)
+    yield drain(buffer)
+
+# format -> (mimetype, encoder, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_stream, 'ndjson'),
+    'csv': ('text/csv', csv_stream, 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', arrow_stream, 'arrow')
+}
@@ -0,0 +1,106 @@
+from sqlalchemy import (
+    MetaData, Table, Column, String, Date, Time, Integer, Numeric, func, select, tuple_
+)
+
+from tasks.engines import engines
+
+from spatial import bbox_clause, haversine_clause, radius_bbox
+
+HOT = 'hot'
+ARCHIVE = 'archive'
+BOTH = 'both'
+
+archive_metadata = MetaData()
+
+# Read-only view of the MySQL archive that scripts/migrate_data.py fills
+historical_fire_incidents = Table(
+    'historical_fire_incidents', archive_metadata,
+    Column('id', String(36), primary_key=True),
+    Column('fire_name', String(200)),
+    Column('discovery_date', Date, nullable=False),
+    Column('discovery_time', Time),
+    Column('fire_year', Integer, nullable=False),
+    Column('fire_size_acres', Numeric(10, 2)),
+    Column('fire_size_class', String(1)),
+    Column('latitude', Numeric(10, 6), nullable=False),
+    Column('longitude', Numeric(11, 6), nullable=False),
+    Column('state', String(2)),
+    Column('county', String(50)),
+    Column('cause_description', String(100)),
+    Column('reporting_agency', String(10)),
+    Column('data_source', String(100))
+)
+
+ARCHIVE_COLUMNS = [
+    column for column in historical_fire_incidents.c if column.name not in ('discovery_time', 'data_source')
+]
+
+# Written for fires created through the API; archive_date takes the MySQL default
+ARCHIVE_WRITE_FIELDS = [column.name for column in historical_fire_incidents.c if column.name != 'data_source']
+
+class ReadRouter:
+    # Years before cutoff_year are served from the MySQL archive, later ones from Postgres
+    def __init__(self, archive_url=None, cutoff_year=None):
+        self.archive_url = archive_url
+        self.cutoff_year = cutoff_year
+    
+    @property
+    def enabled(self):
+        return bool(self.archive_url) and self.cutoff_year is not None
+    
+    @property
+    def engine(self):
+        # Pool settings come from MYSQL_POOL_SIZE, MYSQL_MAX_OVERFLOW, MYSQL_POOL_RECYCLE, MYSQL_POOL_TIMEOUT
+        return engines.get('mysql', self.archive_url, 'MYSQL')
+    
+    def route(self, year=None):
+        if not self.enabled:
+            return HOT
+        if year is None:
+            return BOTH
+        return ARCHIVE if year < self.cutoff_year else HOT
+    
+    def archive_fire(self, conn, values, data_source='API'):
+        conn.execute(historical_fire_incidents.insert().values(
+            **{field: values.get(field) for field in ARCHIVE_WRITE_FIELDS}, data_source=data_source
+        ))
+    
+    def hot_min_year(self, route):
+        # Postgres may still hold archived years; a spanning query must not read them twice
+        return self.cutoff_year if route == BOTH else None
+    
+    def archive_select(self, columns, state=None, year=None, size_class=None, spatial=None):
+        table = historical_fire_incidents.c
+        query = select(*columns).where(table.fire_year < self.cutoff_year)
+        if spatial and spatial.get('bbox') is not None:
+            query = query.where(bbox_clause(table, spatial['bbox'], use_grid=False))
+        if spatial and spatial.get('radius') is not None:
+            latitude, longitude, radius_km = spatial['radius']
+            query = query.where(bbox_clause(table, radius_bbox(latitude, longitude, radius_km), use_grid=False))
+            query = query.where(haversine_clause(table, latitude, longitude, radius_km))
+        if state:
+            query = query.where(table.state == state)
+        if year:
+            query = query.where(table.fire_year == year)
+        if size_class:
+            query = query.where(table.fire_size_class == size_class)
+        return query
+    
+    def count_fires(self, state=None, year=None, size_class=None, spatial=None):
+        query = self.archive_select([func.count()], state, year, size_class, spatial)
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+    
+    def fetch_fires(self, state=None, year=None, size_class=None, spatial=None, limit=50, offset=0,
+                    ordered=False, after=None):
+        query = self.archive_select(ARCHIVE_COLUMNS, state, year, size_class, spatial)
+        table = historical_fire_incidents.c
+        if ordered:
+            # Same keyset order as the Postgres cursor pagination: (discovery_date, id) descending
+            if after is not None:
+                query = query.where(tuple_(table.discovery_date, table.id) < tuple_(*after))
+            query = query.order_by(table.discovery_date.desc(), table.id.desc())
+        else:
+            query = query.offset(offset)
+        with self.engine.connect() as conn:
+            return conn.execute(query.limit(limit)).all()
@@ -0,0 +1,12 @@
+import os
+
+from tasks.engines import engines
+
+# Threaded workers keep heartbeating while a request streams a long export; a sync worker is killed
+# once a single response outlasts --timeout
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+def post_fork(server, worker):
+    # With --preload the app, and its engines, are created in the master; each worker opens its own
+    engines.reset_after_fork()
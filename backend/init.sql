@@ -24,8 +24,10 @@ CREATE TABLE reporting_agencies (
     contact_info JSONB
 );
 
+-- Range-partitioned by fire_year so year filters prune to one partition and old years can be
+-- detached whole; the partition key has to be part of the primary key
 CREATE TABLE fire_incidents (
-    id VARCHAR(36) PRIMARY KEY DEFAULT uuid_generate_v4()::text,
+    id VARCHAR(36) NOT NULL DEFAULT uuid_generate_v4()::text,
     fire_name VARCHAR(200),
     discovery_date DATE NOT NULL,
     discovery_time TIME,
@@ -35,6 +37,10 @@ CREATE TABLE fire_incidents (
     fire_size_class VARCHAR(1) CHECK (fire_size_class IN ('A', 'B', 'C', 'D', 'E', 'F', 'G')),
     latitude DECIMAL(10,6) NOT NULL,
     longitude DECIMAL(11,6) NOT NULL,
+    grid_cell BIGINT GENERATED ALWAYS AS (
+        LEAST(FLOOR((latitude + 90) * 10), 1799)::bigint * 3600
+        + LEAST(FLOOR((longitude + 180) * 10), 3599)::bigint
+    ) STORED,
     state VARCHAR(2),
     county VARCHAR(50),
     cause_code INTEGER REFERENCES fire_causes(code),
@@ -57,12 +63,89 @@ CREATE TABLE fire_incidents (
     owner_code INTEGER,
     owner_description VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, fire_year)
+) PARTITION BY RANGE (fire_year);
+
+-- Catches years that have no partition yet; ensure_fire_incident_partition() moves them out
+CREATE TABLE fire_incidents_default PARTITION OF fire_incidents DEFAULT;
+
+CREATE OR REPLACE FUNCTION fire_incident_partition_name(target_year INTEGER) RETURNS TEXT AS $$
+    SELECT format('fire_incidents_y%s', target_year);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Creates the partition for one year if it is missing and returns whether it did. Rows that already
+-- landed in the default partition are moved across; that copy bypasses the rollup triggers, which
+-- only fire for statements against the parent, so the stats are left as they were
+CREATE OR REPLACE FUNCTION ensure_fire_incident_partition(target_year INTEGER) RETURNS BOOLEAN AS $$
+DECLARE
+    partition_name TEXT := fire_incident_partition_name(target_year);
+    column_list TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    
+    PERFORM pg_advisory_xact_lock(hashtext('fire_incidents_partitions'));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM fire_incidents_default WHERE fire_year = target_year) THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF fire_incidents FOR VALUES FROM (%s) TO (%s)',
+                       partition_name, target_year, target_year + 1);
+        RETURN true;
+    END IF;
+    
+    -- Generated columns are recomputed on insert, so only stored ones are copied
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'fire_incidents'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+    
+    ALTER TABLE fire_incidents DETACH PARTITION fire_incidents_default;
+    EXECUTE format('CREATE TABLE %I PARTITION OF fire_incidents FOR VALUES FROM (%s) TO (%s)',
+                   partition_name, target_year, target_year + 1);
+    EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM fire_incidents_default WHERE fire_year = %s',
+                   partition_name, column_list, column_list, target_year);
+    DELETE FROM fire_incidents_default WHERE fire_year = target_year;
+    ALTER TABLE fire_incidents ATTACH PARTITION fire_incidents_default DEFAULT;
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_fire_incident_partitions(years INTEGER[]) RETURNS INTEGER AS $$
+DECLARE
+    target_year INTEGER;
+    created INTEGER := 0;
+BEGIN
+    FOREACH target_year IN ARRAY years LOOP
+        IF ensure_fire_incident_partition(target_year) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Gives every year that was written before its partition existed a partition of its own. The years
+-- are collected by a statement of their own first: the default partition cannot be detached while
+-- a query is still reading it
+CREATE OR REPLACE FUNCTION split_default_fire_incident_partition() RETURNS INTEGER AS $$
+DECLARE
+    years INTEGER[];
+BEGIN
+    SELECT array_agg(DISTINCT fire_year ORDER BY fire_year) INTO years FROM fire_incidents_default;
+    IF years IS NULL THEN
+        RETURN 0;
+    END IF;
+    RETURN ensure_fire_incident_partitions(years);
+END;
+$$ LANGUAGE plpgsql;
 
 CREATE TABLE weather_data (
     id SERIAL PRIMARY KEY,
-    fire_incident_id VARCHAR(36) REFERENCES fire_incidents(id),
+    -- Not a foreign key: fire_incidents is keyed by (id, fire_year) and old years may be detached
+    fire_incident_id VARCHAR(36),
     date DATE NOT NULL,
     temperature_max DECIMAL(5,2),
     temperature_min DECIMAL(5,2),
@@ -74,10 +157,24 @@ CREATE TABLE weather_data (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE analysis_runs (
+    id VARCHAR(36) PRIMARY KEY DEFAULT uuid_generate_v4()::text,
+    analysis_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    parameters JSONB,
+    summary JSONB,
+    error_message TEXT,
+    requested_by VARCHAR(36) REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
 CREATE TABLE analysis_results (
     id SERIAL PRIMARY KEY,
+    run_id VARCHAR(36) REFERENCES analysis_runs(id),
     analysis_type VARCHAR(50) NOT NULL,
-    fire_incident_id VARCHAR(36) REFERENCES fire_incidents(id),
+    fire_incident_id VARCHAR(36),
     cluster_id INTEGER,
     prediction_value DECIMAL(10,2),
     confidence_score DECIMAL(3,2),
@@ -85,13 +182,198 @@ CREATE TABLE analysis_results (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE migration_checkpoints (
+    source VARCHAR(255) NOT NULL,
+    target_table VARCHAR(100) NOT NULL,
+    batch_offset BIGINT NOT NULL,
+    row_count INTEGER NOT NULL,
+    batch_rows INTEGER,
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source, target_table, batch_offset)
+);
+
 CREATE INDEX idx_fire_incidents_year ON fire_incidents(fire_year);
 CREATE INDEX idx_fire_incidents_state ON fire_incidents(state);
 CREATE INDEX idx_fire_incidents_size_class ON fire_incidents(fire_size_class);
-CREATE INDEX idx_fire_incidents_discovery_date ON fire_incidents(discovery_date);
+CREATE INDEX idx_fire_incidents_discovery_date ON fire_incidents(discovery_date DESC, id DESC);
+CREATE INDEX idx_fire_incidents_state_discovery_date ON fire_incidents(state, discovery_date DESC, id DESC);
 CREATE INDEX idx_fire_incidents_coords ON fire_incidents(latitude, longitude);
+CREATE INDEX idx_fire_incidents_grid_cell ON fire_incidents(grid_cell);
 CREATE INDEX idx_weather_data_date ON weather_data(date);
 CREATE INDEX idx_analysis_results_type ON analysis_results(analysis_type);
+CREATE INDEX idx_analysis_results_run ON analysis_results(run_id, id);
+CREATE INDEX idx_analysis_results_run_cluster ON analysis_results(run_id, cluster_id);
+CREATE INDEX idx_analysis_results_run_fire ON analysis_results(run_id, fire_incident_id);
+CREATE INDEX idx_fire_incidents_created_at ON fire_incidents(created_at);
+CREATE INDEX idx_analysis_runs_type_status ON analysis_runs(analysis_type, status, created_at DESC);
+
+CREATE TABLE fire_stats_by_year (
+    fire_year INTEGER PRIMARY KEY,
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE fire_stats_by_state (
+    state VARCHAR(2),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_state_key UNIQUE NULLS NOT DISTINCT (state)
+);
+
+CREATE TABLE fire_stats_by_year_state (
+    fire_year INTEGER NOT NULL,
+    state VARCHAR(2),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_year_state_key UNIQUE NULLS NOT DISTINCT (fire_year, state)
+);
+
+CREATE TABLE fire_stats_by_size_class (
+    fire_size_class VARCHAR(1),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_size_class_key UNIQUE NULLS NOT DISTINCT (fire_size_class)
+);
+
+CREATE TABLE fire_stats_by_year_size_class (
+    fire_year INTEGER NOT NULL,
+    fire_size_class VARCHAR(1),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_year_size_class_key UNIQUE NULLS NOT DISTINCT (fire_year, fire_size_class)
+);
+
+-- Builds the upserts that apply one statement's net effect to every rollup. delta_source selects
+-- (fire_year, state, fire_size_class, sign, acres); transition tables are only visible to the
+-- trigger function itself, so callers EXECUTE the returned statements
+CREATE OR REPLACE FUNCTION fire_stats_rollup_statements(delta_source TEXT) RETURNS SETOF TEXT AS $$
+    SELECT format($sql$
+        WITH delta AS (%1$s)
+        INSERT INTO %2$I AS r (%3$s, fire_count, total_acres)
+        SELECT %3$s, SUM(sign), SUM(sign * COALESCE(acres, 0))
+        FROM delta
+        GROUP BY %3$s
+        HAVING SUM(sign) <> 0 OR SUM(sign * COALESCE(acres, 0)) <> 0
+        ORDER BY %3$s
+        ON CONFLICT ON CONSTRAINT %4$I DO UPDATE SET
+            fire_count = r.fire_count + EXCLUDED.fire_count,
+            total_acres = r.total_acres + EXCLUDED.total_acres
+    $sql$, delta_source, table_name, key_columns, constraint_name)
+    FROM (VALUES
+        ('fire_stats_by_year', 'fire_year', 'fire_stats_by_year_pkey'),
+        ('fire_stats_by_state', 'state', 'fire_stats_by_state_key'),
+        ('fire_stats_by_year_state', 'fire_year, state', 'fire_stats_by_year_state_key'),
+        ('fire_stats_by_size_class', 'fire_size_class', 'fire_stats_by_size_class_key'),
+        ('fire_stats_by_year_size_class', 'fire_year, fire_size_class', 'fire_stats_by_year_size_class_key')
+    ) AS rollups(table_name, key_columns, constraint_name);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Rollup rows are upserted in key order so concurrent writers lock them in the same order
+CREATE OR REPLACE FUNCTION maintain_fire_stats() RETURNS TRIGGER AS $$
+DECLARE
+    delta_source TEXT;
+    statement TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM old_rows';
+    ELSIF TG_OP = 'UPDATE' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM new_rows
+                         UNION ALL
+                         SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM old_rows';
+    ELSE
+        TRUNCATE fire_stats_by_year, fire_stats_by_state, fire_stats_by_year_state, fire_stats_by_size_class,
+                 fire_stats_by_year_size_class;
+        RETURN NULL;
+    END IF;
+    
+    FOR statement IN SELECT fire_stats_rollup_statements(delta_source) LOOP
+        EXECUTE statement;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_fire_stats() RETURNS VOID AS $$
+DECLARE
+    statement TEXT;
+BEGIN
+    LOCK TABLE fire_incidents IN SHARE MODE;
+    TRUNCATE fire_stats_by_year, fire_stats_by_state, fire_stats_by_year_state, fire_stats_by_size_class,
+             fire_stats_by_year_size_class;
+    FOR statement IN SELECT fire_stats_rollup_statements(
+        'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM fire_incidents'
+    ) LOOP
+        EXECUTE statement;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Use a PostGIS geography column for bbox/radius lookups when the extension is installed;
+-- otherwise the API falls back to grid_cell ranges
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'postgis') THEN
+        CREATE EXTENSION IF NOT EXISTS postgis;
+        ALTER TABLE fire_incidents ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+            GENERATED ALWAYS AS (
+                ST_SetSRID(ST_MakePoint(longitude::float8, latitude::float8), 4326)::geography
+            ) STORED;
+        CREATE INDEX IF NOT EXISTS idx_fire_incidents_geog ON fire_incidents USING GIST (geog);
+    END IF;
+END $$;
+
+-- Detaches one year into a standalone table (fire_incidents_y<year>) that can be copied to the
+-- MySQL archive and dropped. Detaching fires no delete triggers, so its rows are taken out of
+-- the rollups here
+CREATE OR REPLACE FUNCTION detach_fire_incident_partition(target_year INTEGER) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := fire_incident_partition_name(target_year);
+    statement TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        RAISE EXCEPTION 'No fire_incidents partition for %', target_year;
+    END IF;
+    
+    EXECUTE format('ALTER TABLE fire_incidents DETACH PARTITION %I', partition_name);
+    FOR statement IN SELECT fire_stats_rollup_statements(format(
+        'SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM %I', partition_name
+    )) LOOP
+        EXECUTE statement;
+    END LOOP;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- updated_at moves on every UPDATE, so the model registry's fingerprint sees in-place edits too
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fire_incidents_touch_updated_at BEFORE UPDATE ON fire_incidents
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER fire_stats_insert AFTER INSERT ON fire_incidents
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_update AFTER UPDATE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_delete AFTER DELETE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_truncate AFTER TRUNCATE ON fire_incidents
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+-- FPA FOD starts in 1992; the worker adds each following year ahead of time
+SELECT ensure_fire_incident_partitions(ARRAY(SELECT generate_series(1992, EXTRACT(YEAR FROM CURRENT_DATE)::integer + 1)));
 
 INSERT INTO fire_causes (code, description, category) VALUES
 (1, 'Lightning', 'Natural'),
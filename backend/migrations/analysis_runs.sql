@@ -0,0 +1,65 @@
+-- Adds analysis_runs and analysis_results.run_id from init.sql to databases created before them. Safe
+-- to rerun:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f backend/migrations/analysis_runs.sql
+--
+-- Results written before runs existed are grouped into one completed legacy run per task invocation:
+-- each invocation appended its rows in a single transaction, so they share analysis_type and created_at.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS analysis_runs (
+    id VARCHAR(36) PRIMARY KEY DEFAULT uuid_generate_v4()::text,
+    analysis_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    parameters JSONB,
+    summary JSONB,
+    error_message TEXT,
+    requested_by VARCHAR(36) REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
+ALTER TABLE analysis_results ADD COLUMN IF NOT EXISTS run_id VARCHAR(36) REFERENCES analysis_runs(id);
+
+INSERT INTO analysis_runs (analysis_type, status, parameters, summary, created_at, started_at, completed_at)
+SELECT
+    analysis_type,
+    'completed',
+    '{"legacy": true}'::jsonb,
+    CASE WHEN analysis_type = 'dbscan_clustering' THEN
+        jsonb_build_object(
+            'total_points', COUNT(*),
+            'n_clusters', COUNT(DISTINCT cluster_id) FILTER (WHERE cluster_id >= 0),
+            'n_noise_points', COUNT(*) FILTER (WHERE cluster_id = -1),
+            'revision', 0
+        )
+    ELSE
+        jsonb_build_object('total_points', COUNT(*), 'revision', 0)
+    END,
+    created_at,
+    created_at,
+    created_at
+FROM analysis_results r
+WHERE run_id IS NULL
+    AND NOT EXISTS (
+        SELECT 1 FROM analysis_runs legacy
+        WHERE legacy.parameters = '{"legacy": true}'::jsonb
+            AND legacy.analysis_type = r.analysis_type AND legacy.created_at IS NOT DISTINCT FROM r.created_at
+    )
+GROUP BY analysis_type, created_at;
+
+UPDATE analysis_results r
+SET run_id = legacy.id
+FROM analysis_runs legacy
+WHERE r.run_id IS NULL
+    AND legacy.parameters = '{"legacy": true}'::jsonb
+    AND legacy.analysis_type = r.analysis_type AND legacy.created_at IS NOT DISTINCT FROM r.created_at;
+
+CREATE INDEX IF NOT EXISTS idx_analysis_results_run ON analysis_results(run_id, id);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_run_cluster ON analysis_results(run_id, cluster_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_run_fire ON analysis_results(run_id, fire_incident_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_runs_type_status ON analysis_runs(analysis_type, status, created_at DESC);
+
+COMMIT;
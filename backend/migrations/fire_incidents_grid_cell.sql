@@ -0,0 +1,33 @@
+-- Adds the grid_cell column and index from init.sql, and the PostGIS geog column when the extension is
+-- available, to databases created before them. The bbox and radius filters of /api/fires and the export
+-- read them. Safe to rerun:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f backend/migrations/fire_incidents_grid_cell.sql
+--
+-- Adding a stored generated column rewrites fire_incidents and computes it for every existing row,
+-- holding an exclusive lock until it finishes; no row triggers fire, so updated_at is left alone.
+
+BEGIN;
+
+ALTER TABLE fire_incidents ADD COLUMN IF NOT EXISTS grid_cell BIGINT GENERATED ALWAYS AS (
+    LEAST(FLOOR((latitude + 90) * 10), 1799)::bigint * 3600
+    + LEAST(FLOOR((longitude + 180) * 10), 3599)::bigint
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_fire_incidents_grid_cell ON fire_incidents(grid_cell);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'postgis') THEN
+        CREATE EXTENSION IF NOT EXISTS postgis;
+        ALTER TABLE fire_incidents ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+            GENERATED ALWAYS AS (
+                ST_SetSRID(ST_MakePoint(longitude::float8, latitude::float8), 4326)::geography
+            ) STORED;
+        CREATE INDEX IF NOT EXISTS idx_fire_incidents_geog ON fire_incidents USING GIST (geog);
+    END IF;
+END $$;
+
+COMMIT;
+
+ANALYZE fire_incidents;
@@ -0,0 +1,14 @@
+-- Adds the updated_at trigger from init.sql to databases created before it existed. Safe to rerun:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f backend/migrations/fire_incidents_updated_at.sql
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS fire_incidents_touch_updated_at ON fire_incidents;
+CREATE TRIGGER fire_incidents_touch_updated_at BEFORE UPDATE ON fire_incidents
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
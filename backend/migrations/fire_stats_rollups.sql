@@ -0,0 +1,137 @@
+-- Adds the fire_stats_* rollup tables and their statement-level triggers from init.sql to databases
+-- created before them, and seeds the rollups from fire_incidents. Run it before
+-- partition_fire_incidents.sql, which reuses these functions. Safe to rerun:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f backend/migrations/fire_stats_rollups.sql
+--
+-- The triggers are installed before the seed in the same transaction, and the seed holds a share
+-- lock on fire_incidents, so no write lands between the two.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS fire_stats_by_year (
+    fire_year INTEGER PRIMARY KEY,
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS fire_stats_by_state (
+    state VARCHAR(2),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_state_key UNIQUE NULLS NOT DISTINCT (state)
+);
+
+CREATE TABLE IF NOT EXISTS fire_stats_by_year_state (
+    fire_year INTEGER NOT NULL,
+    state VARCHAR(2),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_year_state_key UNIQUE NULLS NOT DISTINCT (fire_year, state)
+);
+
+CREATE TABLE IF NOT EXISTS fire_stats_by_size_class (
+    fire_size_class VARCHAR(1),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_size_class_key UNIQUE NULLS NOT DISTINCT (fire_size_class)
+);
+
+CREATE TABLE IF NOT EXISTS fire_stats_by_year_size_class (
+    fire_year INTEGER NOT NULL,
+    fire_size_class VARCHAR(1),
+    fire_count BIGINT NOT NULL DEFAULT 0,
+    total_acres NUMERIC(18,2) NOT NULL DEFAULT 0,
+    CONSTRAINT fire_stats_by_year_size_class_key UNIQUE NULLS NOT DISTINCT (fire_year, fire_size_class)
+);
+
+-- Builds the upserts that apply one statement's net effect to every rollup. delta_source selects
+-- (fire_year, state, fire_size_class, sign, acres); transition tables are only visible to the
+-- trigger function itself, so callers EXECUTE the returned statements
+CREATE OR REPLACE FUNCTION fire_stats_rollup_statements(delta_source TEXT) RETURNS SETOF TEXT AS $$
+    SELECT format($sql$
+        WITH delta AS (%1$s)
+        INSERT INTO %2$I AS r (%3$s, fire_count, total_acres)
+        SELECT %3$s, SUM(sign), SUM(sign * COALESCE(acres, 0))
+        FROM delta
+        GROUP BY %3$s
+        HAVING SUM(sign) <> 0 OR SUM(sign * COALESCE(acres, 0)) <> 0
+        ORDER BY %3$s
+        ON CONFLICT ON CONSTRAINT %4$I DO UPDATE SET
+            fire_count = r.fire_count + EXCLUDED.fire_count,
+            total_acres = r.total_acres + EXCLUDED.total_acres
+    $sql$, delta_source, table_name, key_columns, constraint_name)
+    FROM (VALUES
+        ('fire_stats_by_year', 'fire_year', 'fire_stats_by_year_pkey'),
+        ('fire_stats_by_state', 'state', 'fire_stats_by_state_key'),
+        ('fire_stats_by_year_state', 'fire_year, state', 'fire_stats_by_year_state_key'),
+        ('fire_stats_by_size_class', 'fire_size_class', 'fire_stats_by_size_class_key'),
+        ('fire_stats_by_year_size_class', 'fire_year, fire_size_class', 'fire_stats_by_year_size_class_key')
+    ) AS rollups(table_name, key_columns, constraint_name);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Rollup rows are upserted in key order so concurrent writers lock them in the same order
+CREATE OR REPLACE FUNCTION maintain_fire_stats() RETURNS TRIGGER AS $$
+DECLARE
+    delta_source TEXT;
+    statement TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM old_rows';
+    ELSIF TG_OP = 'UPDATE' THEN
+        delta_source := 'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM new_rows
+                         UNION ALL
+                         SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM old_rows';
+    ELSE
+        TRUNCATE fire_stats_by_year, fire_stats_by_state, fire_stats_by_year_state, fire_stats_by_size_class,
+                 fire_stats_by_year_size_class;
+        RETURN NULL;
+    END IF;
+    
+    FOR statement IN SELECT fire_stats_rollup_statements(delta_source) LOOP
+        EXECUTE statement;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_fire_stats() RETURNS VOID AS $$
+DECLARE
+    statement TEXT;
+BEGIN
+    LOCK TABLE fire_incidents IN SHARE MODE;
+    TRUNCATE fire_stats_by_year, fire_stats_by_state, fire_stats_by_year_state, fire_stats_by_size_class,
+             fire_stats_by_year_size_class;
+    FOR statement IN SELECT fire_stats_rollup_statements(
+        'SELECT fire_year, state, fire_size_class, 1 AS sign, fire_size_acres AS acres FROM fire_incidents'
+    ) LOOP
+        EXECUTE statement;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS fire_stats_insert ON fire_incidents;
+DROP TRIGGER IF EXISTS fire_stats_update ON fire_incidents;
+DROP TRIGGER IF EXISTS fire_stats_delete ON fire_incidents;
+DROP TRIGGER IF EXISTS fire_stats_truncate ON fire_incidents;
+
+CREATE TRIGGER fire_stats_insert AFTER INSERT ON fire_incidents
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_update AFTER UPDATE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_delete AFTER DELETE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_truncate AFTER TRUNCATE ON fire_incidents
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+SELECT rebuild_fire_stats();
+
+COMMIT;
@@ -0,0 +1,27 @@
+-- Adds discovery_time and the (discovery_date, id) keyset index from mysql_init.sql to archives created
+-- before them. API writes for archived years fill discovery_time, and archive pages are read in
+-- (discovery_date, id) order. Safe to rerun:
+--
+--   mysql wildfire_historical < backend/migrations/mysql_historical_discovery_time.sql
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'historical_fire_incidents'
+         AND column_name = 'discovery_time') = 0,
+    'ALTER TABLE historical_fire_incidents ADD COLUMN discovery_time TIME AFTER discovery_date',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'historical_fire_incidents'
+         AND index_name = 'idx_hist_date_id') = 0,
+    'CREATE INDEX idx_hist_date_id ON historical_fire_incidents (discovery_date, id)',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
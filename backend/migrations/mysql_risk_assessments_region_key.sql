@@ -0,0 +1,34 @@
+-- Brings risk_assessments in an existing archive in line with tasks/risk.py. Safe to rerun:
+--
+--   mysql wildfire_historical < backend/migrations/mysql_risk_assessments_region_key.sql
+--
+-- region_id used to be the state plus the first three letters of the county (CA_SAN for both San Diego
+-- and San Bernardino). It is now the state plus the whole county name, upper-cased with runs of other
+-- characters collapsed to '_' (CA_SAN_DIEGO), cut to 50 characters. Existing rows are rewritten to that
+-- form, then only the newest row per (region_id, assessment_date) is kept so the unique key that the
+-- risk upsert relies on can be added.
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'risk_assessments'
+         AND index_name = 'uq_risk_region_date') > 0,
+    'ALTER TABLE risk_assessments DROP INDEX uq_risk_region_date',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
+
+UPDATE risk_assessments
+SET region_id = LEFT(CONCAT(
+    UPPER(state), '_', TRIM(BOTH '_' FROM REGEXP_REPLACE(UPPER(county), '[^A-Z0-9]+', '_'))
+), 50)
+WHERE county IS NOT NULL;
+
+DELETE older FROM risk_assessments AS older
+JOIN risk_assessments AS newer
+    ON newer.region_id = older.region_id
+    AND newer.assessment_date = older.assessment_date
+    AND newer.id > older.id;
+
+ALTER TABLE risk_assessments ADD UNIQUE KEY uq_risk_region_date (region_id, assessment_date);
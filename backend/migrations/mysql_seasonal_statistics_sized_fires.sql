@@ -0,0 +1,28 @@
+-- Adds seasonal_statistics.sized_fires from mysql_init.sql to archives created before it. avg_fire_size
+-- is total_acres over the fires that have a size, and merge-mode upserts need that count to keep the
+-- average right. Safe to rerun:
+--
+--   mysql wildfire_historical < backend/migrations/mysql_seasonal_statistics_sized_fires.sql
+--
+-- Existing rows get the count implied by their stored average, capped at total_fires; rows without an
+-- average fall back to total_fires.
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'seasonal_statistics'
+         AND column_name = 'sized_fires') = 0,
+    'ALTER TABLE seasonal_statistics ADD COLUMN sized_fires INTEGER DEFAULT NULL AFTER total_fires',
+    'DO 0'
+);
+PREPARE migration FROM @ddl;
+EXECUTE migration;
+DEALLOCATE PREPARE migration;
+
+UPDATE seasonal_statistics
+SET sized_fires = CASE
+    WHEN avg_fire_size > 0 THEN LEAST(total_fires, ROUND(total_acres / avg_fire_size))
+    ELSE total_fires
+END
+WHERE sized_fires IS NULL;
+
+ALTER TABLE seasonal_statistics MODIFY COLUMN sized_fires INTEGER DEFAULT 0;
@@ -0,0 +1,260 @@
+-- Converts an existing, unpartitioned fire_incidents table into the range-partitioned layout of
+-- init.sql. Runs in one transaction and holds an exclusive lock on fire_incidents throughout, so
+-- schedule it outside load windows:
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f backend/migrations/partition_fire_incidents.sql
+--
+-- Needs the rollup tables and functions; run fire_stats_rollups.sql first on databases that predate
+-- them. Rows keep their ids. The rollup triggers are recreated after the copy, so fire_stats_*
+-- tables are left as they were.
+
+BEGIN;
+
+LOCK TABLE fire_incidents IN ACCESS EXCLUSIVE MODE;
+
+-- A partitioned table cannot back a foreign key on id alone
+ALTER TABLE weather_data DROP CONSTRAINT IF EXISTS weather_data_fire_incident_id_fkey;
+ALTER TABLE analysis_results DROP CONSTRAINT IF EXISTS analysis_results_fire_incident_id_fkey;
+
+-- Free up the names the new table reuses
+ALTER TABLE fire_incidents RENAME TO fire_incidents_unpartitioned;
+ALTER TABLE fire_incidents_unpartitioned RENAME CONSTRAINT fire_incidents_pkey TO fire_incidents_unpartitioned_pkey;
+ALTER TABLE fire_incidents_unpartitioned
+    DROP CONSTRAINT IF EXISTS fire_incidents_fire_size_class_check,
+    DROP CONSTRAINT IF EXISTS fire_incidents_cause_code_fkey,
+    DROP CONSTRAINT IF EXISTS fire_incidents_reporting_agency_fkey;
+DROP TRIGGER IF EXISTS fire_stats_insert ON fire_incidents_unpartitioned;
+DROP TRIGGER IF EXISTS fire_stats_update ON fire_incidents_unpartitioned;
+DROP TRIGGER IF EXISTS fire_stats_delete ON fire_incidents_unpartitioned;
+DROP TRIGGER IF EXISTS fire_stats_truncate ON fire_incidents_unpartitioned;
+DROP TRIGGER IF EXISTS fire_incidents_touch_updated_at ON fire_incidents_unpartitioned;
+DROP INDEX IF EXISTS
+    idx_fire_incidents_year,
+    idx_fire_incidents_state,
+    idx_fire_incidents_size_class,
+    idx_fire_incidents_discovery_date,
+    idx_fire_incidents_state_discovery_date,
+    idx_fire_incidents_coords,
+    idx_fire_incidents_grid_cell,
+    idx_fire_incidents_created_at,
+    idx_fire_incidents_geog;
+
+CREATE TABLE fire_incidents (
+    id VARCHAR(36) NOT NULL DEFAULT uuid_generate_v4()::text,
+    fire_name VARCHAR(200),
+    discovery_date DATE NOT NULL,
+    discovery_time TIME,
+    contained_date DATE,
+    fire_year INTEGER NOT NULL,
+    fire_size_acres DECIMAL(10,2),
+    fire_size_class VARCHAR(1) CHECK (fire_size_class IN ('A', 'B', 'C', 'D', 'E', 'F', 'G')),
+    latitude DECIMAL(10,6) NOT NULL,
+    longitude DECIMAL(11,6) NOT NULL,
+    grid_cell BIGINT GENERATED ALWAYS AS (
+        LEAST(FLOOR((latitude + 90) * 10), 1799)::bigint * 3600
+        + LEAST(FLOOR((longitude + 180) * 10), 3599)::bigint
+    ) STORED,
+    state VARCHAR(2),
+    county VARCHAR(50),
+    cause_code INTEGER REFERENCES fire_causes(code),
+    cause_description VARCHAR(100),
+    reporting_agency VARCHAR(10) REFERENCES reporting_agencies(code),
+    reporting_unit VARCHAR(10),
+    nwcg_reporting_agency VARCHAR(10),
+    source_system VARCHAR(50),
+    source_system_type VARCHAR(50),
+    local_fire_report_id VARCHAR(50),
+    local_incident_id VARCHAR(50),
+    complex_name VARCHAR(200),
+    fire_mgmt_complexity VARCHAR(50),
+    suppression_method VARCHAR(50),
+    weather_conditions JSONB,
+    fuel_model VARCHAR(50),
+    slope_class VARCHAR(10),
+    aspect_direction VARCHAR(10),
+    elevation_feet INTEGER,
+    owner_code INTEGER,
+    owner_description VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, fire_year)
+) PARTITION BY RANGE (fire_year);
+
+CREATE TABLE fire_incidents_default PARTITION OF fire_incidents DEFAULT;
+
+CREATE OR REPLACE FUNCTION fire_incident_partition_name(target_year INTEGER) RETURNS TEXT AS $$
+    SELECT format('fire_incidents_y%s', target_year);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Creates the partition for one year if it is missing and returns whether it did. Rows that already
+-- landed in the default partition are moved across; that copy bypasses the rollup triggers, which
+-- only fire for statements against the parent, so the stats are left as they were
+CREATE OR REPLACE FUNCTION ensure_fire_incident_partition(target_year INTEGER) RETURNS BOOLEAN AS $$
+DECLARE
+    partition_name TEXT := fire_incident_partition_name(target_year);
+    column_list TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    
+    PERFORM pg_advisory_xact_lock(hashtext('fire_incidents_partitions'));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM fire_incidents_default WHERE fire_year = target_year) THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF fire_incidents FOR VALUES FROM (%s) TO (%s)',
+                       partition_name, target_year, target_year + 1);
+        RETURN true;
+    END IF;
+    
+    -- Generated columns are recomputed on insert, so only stored ones are copied
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'fire_incidents'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+    
+    ALTER TABLE fire_incidents DETACH PARTITION fire_incidents_default;
+    EXECUTE format('CREATE TABLE %I PARTITION OF fire_incidents FOR VALUES FROM (%s) TO (%s)',
+                   partition_name, target_year, target_year + 1);
+    EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM fire_incidents_default WHERE fire_year = %s',
+                   partition_name, column_list, column_list, target_year);
+    DELETE FROM fire_incidents_default WHERE fire_year = target_year;
+    ALTER TABLE fire_incidents ATTACH PARTITION fire_incidents_default DEFAULT;
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_fire_incident_partitions(years INTEGER[]) RETURNS INTEGER AS $$
+DECLARE
+    target_year INTEGER;
+    created INTEGER := 0;
+BEGIN
+    FOREACH target_year IN ARRAY years LOOP
+        IF ensure_fire_incident_partition(target_year) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Gives every year that was written before its partition existed a partition of its own. The years
+-- are collected by a statement of their own first: the default partition cannot be detached while
+-- a query is still reading it
+CREATE OR REPLACE FUNCTION split_default_fire_incident_partition() RETURNS INTEGER AS $$
+DECLARE
+    years INTEGER[];
+BEGIN
+    SELECT array_agg(DISTINCT fire_year ORDER BY fire_year) INTO years FROM fire_incidents_default;
+    IF years IS NULL THEN
+        RETURN 0;
+    END IF;
+    RETURN ensure_fire_incident_partitions(years);
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'fire_incidents_unpartitioned' AND column_name = 'geog'
+    ) THEN
+        ALTER TABLE fire_incidents ADD COLUMN geog geography(Point, 4326)
+            GENERATED ALWAYS AS (
+                ST_SetSRID(ST_MakePoint(longitude::float8, latitude::float8), 4326)::geography
+            ) STORED;
+    END IF;
+END $$;
+
+-- One partition per year already present, plus the current and next year
+SELECT ensure_fire_incident_partitions(ARRAY(
+    SELECT DISTINCT fire_year FROM fire_incidents_unpartitioned
+    UNION
+    SELECT generate_series(EXTRACT(YEAR FROM CURRENT_DATE)::integer, EXTRACT(YEAR FROM CURRENT_DATE)::integer + 1)
+    ORDER BY 1
+));
+
+-- Generated columns are recomputed on insert, so only stored ones are copied
+DO $$
+DECLARE
+    column_list TEXT;
+BEGIN
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'fire_incidents'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+    EXECUTE format('INSERT INTO fire_incidents (%s) SELECT %s FROM fire_incidents_unpartitioned', column_list, column_list);
+END $$;
+
+-- Built after the copy: one pass per index instead of per-row maintenance
+CREATE INDEX idx_fire_incidents_year ON fire_incidents(fire_year);
+CREATE INDEX idx_fire_incidents_state ON fire_incidents(state);
+CREATE INDEX idx_fire_incidents_size_class ON fire_incidents(fire_size_class);
+CREATE INDEX idx_fire_incidents_discovery_date ON fire_incidents(discovery_date DESC, id DESC);
+CREATE INDEX idx_fire_incidents_state_discovery_date ON fire_incidents(state, discovery_date DESC, id DESC);
+CREATE INDEX idx_fire_incidents_coords ON fire_incidents(latitude, longitude);
+CREATE INDEX idx_fire_incidents_grid_cell ON fire_incidents(grid_cell);
+CREATE INDEX idx_fire_incidents_created_at ON fire_incidents(created_at);
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'fire_incidents' AND column_name = 'geog'
+    ) THEN
+        CREATE INDEX idx_fire_incidents_geog ON fire_incidents USING GIST (geog);
+    END IF;
+END $$;
+
+-- Detaches one year into a standalone table (fire_incidents_y<year>) that can be copied to the
+-- MySQL archive and dropped. Detaching fires no delete triggers, so its rows are taken out of
+-- the rollups here
+CREATE OR REPLACE FUNCTION detach_fire_incident_partition(target_year INTEGER) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := fire_incident_partition_name(target_year);
+    statement TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        RAISE EXCEPTION 'No fire_incidents partition for %', target_year;
+    END IF;
+    
+    EXECUTE format('ALTER TABLE fire_incidents DETACH PARTITION %I', partition_name);
+    FOR statement IN SELECT fire_stats_rollup_statements(format(
+        'SELECT fire_year, state, fire_size_class, -1 AS sign, fire_size_acres AS acres FROM %I', partition_name
+    )) LOOP
+        EXECUTE statement;
+    END LOOP;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- updated_at moves on every UPDATE, so the model registry's fingerprint sees in-place edits too
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fire_incidents_touch_updated_at BEFORE UPDATE ON fire_incidents
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER fire_stats_insert AFTER INSERT ON fire_incidents
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_update AFTER UPDATE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_delete AFTER DELETE ON fire_incidents
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+CREATE TRIGGER fire_stats_truncate AFTER TRUNCATE ON fire_incidents
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_fire_stats();
+
+DROP TABLE fire_incidents_unpartitioned;
+
+COMMIT;
+
+ANALYZE fire_incidents;
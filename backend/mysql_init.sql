@@ -4,6 +4,7 @@ CREATE TABLE historical_fire_incidents (
     id VARCHAR(36) PRIMARY KEY,
     fire_name VARCHAR(200),
     discovery_date DATE NOT NULL,
+    discovery_time TIME,
     fire_year INTEGER NOT NULL,
     fire_size_acres DECIMAL(10,2),
     fire_size_class VARCHAR(1),
@@ -17,6 +18,7 @@ CREATE TABLE historical_fire_incidents (
     data_source VARCHAR(100),
     INDEX idx_hist_year (fire_year),
     INDEX idx_hist_state (state),
+    INDEX idx_hist_date_id (discovery_date, id),
     INDEX idx_hist_coords (latitude, longitude)
 );
 
@@ -26,6 +28,7 @@ CREATE TABLE seasonal_statistics (
     season ENUM('Spring', 'Summer', 'Fall', 'Winter') NOT NULL,
     state VARCHAR(2),
     total_fires INTEGER DEFAULT 0,
+    sized_fires INTEGER DEFAULT 0,
     total_acres DECIMAL(15,2) DEFAULT 0,
     avg_fire_size DECIMAL(10,2) DEFAULT 0,
     max_fire_size DECIMAL(10,2) DEFAULT 0,
@@ -34,6 +37,16 @@ CREATE TABLE seasonal_statistics (
     UNIQUE KEY unique_year_season_state (year, season, state)
 );
 
+CREATE TABLE seasonal_cause_counts (
+    year INTEGER NOT NULL,
+    season ENUM('Spring', 'Summer', 'Fall', 'Winter') NOT NULL,
+    state VARCHAR(2) NOT NULL,
+    cause VARCHAR(100) NOT NULL,
+    fire_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (year, season, state, cause)
+);
+
 CREATE TABLE fire_trends (
     id INT AUTO_INCREMENT PRIMARY KEY,
     year INTEGER NOT NULL,
@@ -61,6 +74,7 @@ CREATE TABLE risk_assessments (
     valid_until DATE,
     created_by VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_risk_region_date (region_id, assessment_date),
     INDEX idx_risk_region (region_id),
     INDEX idx_risk_level (risk_level),
     INDEX idx_risk_date (assessment_date)
@@ -85,19 +99,29 @@ CREATE TABLE climate_data (
     INDEX idx_climate_coords (latitude, longitude)
 );
 
-INSERT INTO seasonal_statistics (year, season, state, total_fires, total_acres, avg_fire_size, dominant_cause) VALUES
-(2023, 'Summer', 'CA', 4253, 1847362.5, 434.2, 'Lightning'),
-(2023, 'Fall', 'CA', 2156, 892341.8, 414.1, 'Equipment Use'),
-(2023, 'Spring', 'CA', 1832, 456789.3, 249.3, 'Debris Burning'),
-(2023, 'Winter', 'CA', 543, 123456.7, 227.4, 'Campfire'),
-(2023, 'Summer', 'TX', 3421, 1234567.9, 361.0, 'Lightning'),
-(2023, 'Fall', 'TX', 1987, 567890.1, 285.9, 'Equipment Use'),
-(2023, 'Spring', 'TX', 2341, 789012.3, 337.2, 'Debris Burning'),
-(2023, 'Winter', 'TX', 892, 234567.8, 263.1, 'Miscellaneous');
+CREATE TABLE migration_checkpoints (
+    source VARCHAR(255) NOT NULL,
+    target_table VARCHAR(100) NOT NULL,
+    batch_offset BIGINT NOT NULL,
+    row_count INTEGER NOT NULL,
+    batch_rows INTEGER,
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source, target_table, batch_offset)
+);
+
+INSERT INTO seasonal_statistics (year, season, state, total_fires, sized_fires, total_acres, avg_fire_size, dominant_cause) VALUES
+(2023, 'Summer', 'CA', 4253, 4253, 1847362.5, 434.2, 'Lightning'),
+(2023, 'Fall', 'CA', 2156, 2156, 892341.8, 414.1, 'Equipment Use'),
+(2023, 'Spring', 'CA', 1832, 1832, 456789.3, 249.3, 'Debris Burning'),
+(2023, 'Winter', 'CA', 543, 543, 123456.7, 227.4, 'Campfire'),
+(2023, 'Summer', 'TX', 3421, 3421, 1234567.9, 361.0, 'Lightning'),
+(2023, 'Fall', 'TX', 1987, 1987, 567890.1, 285.9, 'Equipment Use'),
+(2023, 'Spring', 'TX', 2341, 2341, 789012.3, 337.2, 'Debris Burning'),
+(2023, 'Winter', 'TX', 892, 892, 234567.8, 263.1, 'Miscellaneous');
 
 INSERT INTO risk_assessments (region_id, state, county, risk_level, risk_score, primary_risk_factors, assessment_date, valid_until) VALUES
-('CA_001', 'CA', 'Los Angeles', 'High', 7.8, '["drought_conditions", "high_temperature", "low_humidity", "dense_vegetation"]', '2024-01-15', '2024-07-15'),
-('CA_002', 'CA', 'Riverside', 'Extreme', 9.2, '["extreme_drought", "heat_wave", "santa_ana_winds", "fuel_accumulation"]', '2024-01-15', '2024-07-15'),
-('TX_001', 'TX', 'Harris', 'Moderate', 5.4, '["moderate_drought", "urban_interface", "equipment_use"]', '2024-01-15', '2024-07-15'),
-('FL_001', 'FL', 'Miami-Dade', 'Low', 3.2, '["high_humidity", "frequent_precipitation"]', '2024-01-15', '2024-07-15'),
-('OR_001', 'OR', 'Jackson', 'High', 8.1, '["dry_conditions", "dense_forest", "lightning_activity"]', '2024-01-15', '2024-07-15');
\ No newline at end of file
+('CA_LOS_ANGELES', 'CA', 'Los Angeles', 'High', 7.8, '["drought_conditions", "high_temperature", "low_humidity", "dense_vegetation"]', '2024-01-15', '2024-07-15'),
+('CA_RIVERSIDE', 'CA', 'Riverside', 'Extreme', 9.2, '["extreme_drought", "heat_wave", "santa_ana_winds", "fuel_accumulation"]', '2024-01-15', '2024-07-15'),
+('TX_HARRIS', 'TX', 'Harris', 'Moderate', 5.4, '["moderate_drought", "urban_interface", "equipment_use"]', '2024-01-15', '2024-07-15'),
+('FL_MIAMI_DADE', 'FL', 'Miami-Dade', 'Low', 3.2, '["high_humidity", "frequent_precipitation"]', '2024-01-15', '2024-07-15'),
+('OR_JACKSON', 'OR', 'Jackson', 'High', 8.1, '["dry_conditions", "dense_forest", "lightning_activity"]', '2024-01-15', '2024-07-15');
\ No newline at end of file
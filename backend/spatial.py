@@ -0,0 +1,151 @@
+import math
+
+from sqlalchemy import and_, or_, between, cast, func, text, Float
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# fire_incidents.grid_cell numbers 0.1 degree cells row-major from (-90, -180), so every
+# latitude row of a bounding box is one contiguous grid_cell range
+GRID_CELLS_PER_DEGREE = 10
+GRID_COLUMNS = 360 * GRID_CELLS_PER_DEGREE
+GRID_ROWS = 180 * GRID_CELLS_PER_DEGREE
+GRID_CELL_SQL = (
+    f"LEAST(FLOOR((latitude + 90) * {GRID_CELLS_PER_DEGREE}), {GRID_ROWS - 1})::bigint * {GRID_COLUMNS}"
+    f" + LEAST(FLOOR((longitude + 180) * {GRID_CELLS_PER_DEGREE}), {GRID_COLUMNS - 1})::bigint"
+)
+
+# Boxes taller than this are filtered on latitude/longitude alone rather than hundreds of ranges
+MAX_GRID_ROWS = 200
+MAX_RADIUS_KM = 1000
+
+_geography_available = None
+
+def parse_bbox(value):
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox must be west,south,east,north')
+    west, south, east, north = parts
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError('bbox is out of range')
+    return west, south, east, north
+
+def parse_radius(latitude, longitude, radius_km):
+    latitude, longitude, radius_km = float(latitude), float(longitude), float(radius_km)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('lat/lon is out of range')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f'radius_km must be between 0 and {MAX_RADIUS_KM}')
+    return latitude, longitude, radius_km
+
+def parse_spatial_args(args):
+    spatial = {}
+    if args.get('bbox'):
+        spatial['bbox'] = parse_bbox(args['bbox'])
+    if any(args.get(name) for name in ('lat', 'lon', 'radius_km')):
+        if not all(args.get(name) for name in ('lat', 'lon', 'radius_km')):
+            raise ValueError('lat, lon and radius_km must be given together')
+        spatial['radius'] = parse_radius(args['lat'], args['lon'], args['radius_km'])
+    return spatial
+
+def longitude_intervals(west, east):
+    if west <= east:
+        return [(west, east)]
+    # Crosses the antimeridian
+    return [(west, 180.0), (-180.0, east)]
+
+def radius_bbox(latitude, longitude, radius_km):
+    delta_lat = radius_km / KM_PER_DEGREE
+    south = max(latitude - delta_lat, -90.0)
+    north = min(latitude + delta_lat, 90.0)
+    
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if cos_lat <= 1e-6 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return -180.0, south, 180.0, north
+    
+    delta_lon = radius_km / (KM_PER_DEGREE * cos_lat)
+    west = (longitude - delta_lon + 540) % 360 - 180
+    east = (longitude + delta_lon + 540) % 360 - 180
+    return west, south, east, north
+
+def grid_index(latitude, longitude):
+    row = min(int(math.floor((latitude + 90) * GRID_CELLS_PER_DEGREE)), GRID_ROWS - 1)
+    column = min(int(math.floor((longitude + 180) * GRID_CELLS_PER_DEGREE)), GRID_COLUMNS - 1)
+    return row, column
+
+def grid_ranges(bbox):
+    west, south, east, north = bbox
+    first_row, _ = grid_index(south, 0)
+    last_row, _ = grid_index(north, 0)
+    if last_row - first_row + 1 > MAX_GRID_ROWS:
+        return None
+    
+    ranges = []
+    for low, high in longitude_intervals(west, east):
+        _, first_column = grid_index(0, low)
+        _, last_column = grid_index(0, high)
+        for row in range(first_row, last_row + 1):
+            ranges.append((row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column))
+    return ranges
+
+def bbox_clause(model, bbox, use_grid=True):
+    west, south, east, north = bbox
+    clauses = [model.latitude.between(south, north)]
+    clauses.append(or_(*[model.longitude.between(low, high) for low, high in longitude_intervals(west, east)]))
+    
+    ranges = grid_ranges(bbox) if use_grid else None
+    if ranges is not None:
+        clauses.append(or_(*[between(model.grid_cell, low, high) for low, high in ranges]))
+    return and_(*clauses)
+
+def geography_bbox_clause(bbox):
+    west, south, east, north = bbox
+    return or_(*[
+        text(f"geog && ST_MakeEnvelope(:bbox_w{i}, :bbox_s{i}, :bbox_e{i}, :bbox_n{i}, 4326)::geography").bindparams(
+            **{f'bbox_w{i}': low, f'bbox_s{i}': south, f'bbox_e{i}': high, f'bbox_n{i}': north}
+        )
+        for i, (low, high) in enumerate(longitude_intervals(west, east))
+    ])
+
+def haversine_clause(model, latitude, longitude, radius_km):
+    lat1 = math.radians(latitude)
+    lat2 = func.radians(cast(model.latitude, Float))
+    delta_lat = lat2 - lat1
+    delta_lon = func.radians(cast(model.longitude, Float)) - math.radians(longitude)
+    
+    a = func.power(func.sin(delta_lat / 2), 2) + math.cos(lat1) * func.cos(lat2) * func.power(func.sin(delta_lon / 2), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(func.sqrt(a), 1.0)) <= radius_km
+
+def geography_available(session):
+    global _geography_available
+    if _geography_available is None:
+        try:
+            _geography_available = bool(session.execute(text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'fire_incidents' AND column_name = 'geog'
+            """)).scalar())
+        except Exception:
+            session.rollback()
+            _geography_available = False
+    return _geography_available
+
+def spatial_filter(query, model, session, bbox=None, radius=None):
+    use_geography = geography_available(session)
+    
+    if bbox is not None:
+        # The geography/grid predicate drives the index; the latitude/longitude bounds make it exact
+        query = query.filter(bbox_clause(model, bbox, use_grid=not use_geography))
+        if use_geography:
+            query = query.filter(geography_bbox_clause(bbox))
+    
+    if radius is not None:
+        latitude, longitude, radius_km = radius
+        if use_geography:
+            query = query.filter(text(
+                "ST_DWithin(geog, ST_SetSRID(ST_MakePoint(:near_lon, :near_lat), 4326)::geography, :near_m)"
+            ).bindparams(near_lon=longitude, near_lat=latitude, near_m=radius_km * 1000))
+        else:
+            query = query.filter(bbox_clause(model, radius_bbox(latitude, longitude, radius_km)))
+            query = query.filter(haversine_clause(model, latitude, longitude, radius_km))
+    
+    return query
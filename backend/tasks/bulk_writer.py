@@ -0,0 +1,81 @@
+import io
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Connection
+
+COPY_CHUNK_ROWS = 100000
+
+ANALYSIS_RESULT_COLUMNS = [
+    'run_id', 'analysis_type', 'fire_incident_id', 'cluster_id',
+    'prediction_value', 'confidence_score', 'metadata'
+]
+
+def copy_chunks(cursor, table, frame, chunk_rows):
+    columns = ', '.join(frame.columns)
+    statement = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    for start in range(0, len(frame), chunk_rows):
+        buffer = io.StringIO()
+        frame.iloc[start:start + chunk_rows].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+
+def copy_frame(bind, table, frame, chunk_rows=COPY_CHUNK_ROWS):
+    if isinstance(bind, Connection):
+        # Part of the caller's transaction, which decides whether the rows are committed
+        cursor = bind.connection.cursor()
+        try:
+            copy_chunks(cursor, table, frame, chunk_rows)
+        finally:
+            cursor.close()
+        return len(frame)
+    
+    raw_connection = bind.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        copy_chunks(cursor, table, frame, chunk_rows)
+        cursor.close()
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+    
+    return len(frame)
+
+def json_metadata(**columns):
+    # Builds one JSON object per row from numeric columns without a Python-level loop
+    parts = []
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        text = pd.Series(values.astype(str)).where(~np.isnan(values), 'null')
+        parts.append(f'"{name}": ' + text)
+    
+    metadata = parts[0]
+    for part in parts[1:]:
+        metadata = metadata + ', ' + part
+    return '{' + metadata + '}'
+
+def write_analysis_results(bind, run_id, analysis_type, fire_incident_ids=None, cluster_ids=None,
+                           prediction_values=None, confidence_scores=None, metadata=None,
+                           chunk_rows=COPY_CHUNK_ROWS):
+    columns = {
+        'fire_incident_id': fire_incident_ids,
+        'cluster_id': cluster_ids,
+        'prediction_value': prediction_values,
+        'confidence_score': confidence_scores,
+        'metadata': metadata
+    }
+    n_rows = max(len(values) for values in columns.values() if values is not None)
+    
+    frame = pd.DataFrame({
+        'run_id': np.repeat(run_id, n_rows),
+        'analysis_type': np.repeat(analysis_type, n_rows),
+        **{
+            name: (np.asarray(values) if values is not None else np.full(n_rows, None))
+            for name, values in columns.items()
+        }
+    }, columns=ANALYSIS_RESULT_COLUMNS)
+    
+    return copy_frame(bind, 'analysis_results', frame, chunk_rows)
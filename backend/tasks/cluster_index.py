@@ -0,0 +1,156 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+
+from tasks.clustering import km_to_radians, to_radians, flatten_neighbors
+
+NO_LABEL = np.iinfo(np.int64).max
+
+class ClusterIndex:
+    def __init__(self, ids, points, labels, is_core, eps_km, min_samples, watermark=None,
+                 rebuild_fraction=0.1):
+        self.ids = np.asarray(ids, dtype=object)
+        self.points = points
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.is_core = np.asarray(is_core, dtype=bool)
+        self.eps_km = eps_km
+        self.min_samples = min_samples
+        self.watermark = watermark
+        self.rebuild_fraction = rebuild_fraction
+        self.next_label = int(self.labels.max()) + 1 if len(self.labels) else 0
+        self.tree = BallTree(points, metric='haversine')
+        self.n_indexed = len(self.points)
+        self.delta_tree = None
+    
+    @classmethod
+    def build(cls, ids, latitude, longitude, labels, is_core, eps_km, min_samples, watermark=None):
+        return cls(ids, to_radians(latitude, longitude), labels, is_core, eps_km, min_samples, watermark)
+    
+    @property
+    def radius(self):
+        return km_to_radians(self.eps_km)
+    
+    def query(self, X):
+        neighbors = self.tree.query_radius(X, r=self.radius)
+        if self.delta_tree is None:
+            return neighbors
+        delta = self.delta_tree.query_radius(X, r=self.radius)
+        return [np.concatenate([base, extra + self.n_indexed]) for base, extra in zip(neighbors, delta)]
+    
+    def append(self, ids, points):
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=object)])
+        self.points = np.vstack([self.points, points])
+        self.labels = np.concatenate([self.labels, np.full(len(points), -1, dtype=np.int64)])
+        self.is_core = np.concatenate([self.is_core, np.zeros(len(points), dtype=bool)])
+        
+        if len(self.points) - self.n_indexed > self.rebuild_fraction * self.n_indexed:
+            self.tree = BallTree(self.points, metric='haversine')
+            self.n_indexed = len(self.points)
+            self.delta_tree = None
+        else:
+            self.delta_tree = BallTree(self.points[self.n_indexed:], metric='haversine')
+    
+    def merge_changed_cores(self, changed, neighbor_lists):
+        flat, owner, _ = flatten_neighbors([neighbor_lists[i] for i in changed])
+        core_neighbor = self.is_core[flat]
+        flat, owner = flat[core_neighbor], owner[core_neighbor]
+        
+        position = np.searchsorted(changed, flat)
+        position = np.minimum(position, len(changed) - 1)
+        is_changed = changed[position] == flat
+        
+        n_changed = len(changed)
+        targets = np.where(is_changed, position, n_changed + self.labels[flat])
+        n_nodes = n_changed + self.next_label
+        graph = coo_matrix(
+            (np.ones(len(owner), dtype=np.int8), (owner, targets)),
+            shape=(n_nodes, n_nodes)
+        )
+        _, component = connected_components(graph, directed=False)
+        
+        merged = np.full(component.max() + 1, NO_LABEL)
+        np.minimum.at(merged, component[n_changed:], np.arange(self.next_label))
+        
+        changed_components = component[:n_changed]
+        unlabeled = np.unique(changed_components[merged[changed_components] == NO_LABEL])
+        merged[unlabeled] = self.next_label + np.arange(len(unlabeled))
+        self.next_label += len(unlabeled)
+        
+        label_lookup = merged[component[n_changed:]]
+        merges = {
+            int(old): int(new)
+            for old, new in enumerate(label_lookup) if old != new
+        }
+        if merges:
+            clustered = self.labels >= 0
+            self.labels[clustered] = label_lookup[self.labels[clustered]]
+        
+        self.labels[changed] = merged[changed_components]
+        return merges
+    
+    def add_points(self, ids, latitude, longitude, watermark=None):
+        if watermark is not None:
+            self.watermark = watermark
+        
+        if len(ids) == 0:
+            return {
+                'new_labels': np.empty(0, dtype=np.int64),
+                'adopted_ids': np.empty(0, dtype=object),
+                'adopted_labels': np.empty(0, dtype=np.int64),
+                'merges': {},
+                'new_core_points': 0
+            }
+        
+        start = len(self.ids)
+        new_points = to_radians(latitude, longitude)
+        self.append(ids, new_points)
+        new_index = np.arange(start, start + len(new_points))
+        previous_labels = self.labels.copy()
+        
+        neighbor_lists = dict(zip(new_index, self.query(new_points)))
+        touched = np.unique(np.concatenate(list(neighbor_lists.values())))
+        candidates = touched[(touched < start) & ~self.is_core[touched]]
+        if len(candidates):
+            neighbor_lists.update(zip(candidates, self.query(self.points[candidates])))
+        
+        counts = {i: len(n) for i, n in neighbor_lists.items()}
+        changed = np.array(
+            sorted(i for i in np.concatenate([new_index, candidates]) if counts[i] >= self.min_samples),
+            dtype=np.int64
+        )
+        self.is_core[changed] = True
+        
+        merges = self.merge_changed_cores(changed, neighbor_lists) if len(changed) else {}
+        
+        for i in changed:
+            neighbors = neighbor_lists[i]
+            adopt = neighbors[self.labels[neighbors] == -1]
+            self.labels[adopt] = self.labels[i]
+        
+        for i in new_index:
+            if self.labels[i] != -1:
+                continue
+            neighbors = neighbor_lists[i]
+            core_neighbors = neighbors[self.is_core[neighbors]]
+            if len(core_neighbors):
+                self.labels[i] = self.labels[core_neighbors[0]]
+        
+        old_index = np.arange(start)
+        adopted = old_index[(previous_labels[:start] == -1) & (self.labels[:start] != -1)]
+        
+        return {
+            'new_labels': self.labels[new_index],
+            'adopted_ids': self.ids[adopted],
+            'adopted_labels': self.labels[adopted],
+            'merges': merges,
+            'new_core_points': int(len(changed))
+        }
+    
+    @property
+    def n_clusters(self):
+        return int(len(np.unique(self.labels[self.labels >= 0])))
+    
+    @property
+    def n_noise(self):
+        return int((self.labels == -1).sum())
@@ -0,0 +1,137 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Rough per-item costs used to size query chunks against the memory budget
+NEIGHBOR_BYTES = 48
+POINT_OVERHEAD_BYTES = 160
+FIXED_BYTES_PER_POINT = 96
+MIN_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 200000
+
+def km_to_radians(distance_km):
+    return distance_km / EARTH_RADIUS_KM
+
+def to_radians(latitude, longitude):
+    return np.radians(np.column_stack([
+        np.asarray(latitude, dtype=np.float64),
+        np.asarray(longitude, dtype=np.float64)
+    ]))
+
+def deduplicate_points(points):
+    unique_points, inverse, counts = np.unique(points, axis=0, return_inverse=True, return_counts=True)
+    return unique_points, inverse.ravel(), counts.astype(np.float64)
+
+def estimate_chunk_size(tree, points, radius, memory_budget_mb, sample_size=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = points[rng.choice(len(points), size=min(sample_size, len(points)), replace=False)]
+    counts = tree.query_radius(sample, r=radius, count_only=True)
+    
+    # Dense areas dominate peak memory, so size for the 99th percentile neighborhood
+    per_point = max(float(np.percentile(counts, 99)), 1.0) * NEIGHBOR_BYTES + POINT_OVERHEAD_BYTES
+    available = memory_budget_mb * 2 ** 20 - len(points) * FIXED_BYTES_PER_POINT
+    
+    return int(np.clip(available / per_point, MIN_CHUNK_SIZE, MAX_CHUNK_SIZE))
+
+def flatten_neighbors(neighbors):
+    lengths = np.fromiter((len(n) for n in neighbors), dtype=np.int64, count=len(neighbors))
+    if lengths.sum() == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), lengths
+    flat = np.concatenate(neighbors).astype(np.int64, copy=False)
+    owner = np.repeat(np.arange(len(neighbors)), lengths)
+    return flat, owner, lengths
+
+def merge_components(component, src, dst):
+    a = component[src]
+    b = component[dst]
+    keep = a != b
+    if not keep.any():
+        return component
+    
+    a, b = a[keep], b[keep]
+    nodes, inverse = np.unique(np.concatenate([a, b]), return_inverse=True)
+    graph = coo_matrix(
+        (np.ones(len(a), dtype=np.int8), (inverse[:len(a)], inverse[len(a):])),
+        shape=(len(nodes), len(nodes))
+    )
+    _, sub_labels = connected_components(graph, directed=False)
+    
+    representative = np.full(sub_labels.max() + 1, np.iinfo(np.int64).max)
+    np.minimum.at(representative, sub_labels, nodes)
+    
+    lookup = np.arange(len(component))
+    lookup[nodes] = representative[sub_labels]
+    return lookup[component]
+
+def find_core_points(tree, points, weights, radius, min_samples, chunk_size):
+    is_core = np.zeros(len(points), dtype=bool)
+    
+    for start in range(0, len(points), chunk_size):
+        stop = min(start + chunk_size, len(points))
+        neighbors = tree.query_radius(points[start:stop], r=radius)
+        flat, owner, _ = flatten_neighbors(neighbors)
+        weighted_counts = np.bincount(owner, weights=weights[flat], minlength=stop - start)
+        is_core[start:stop] = weighted_counts >= min_samples
+    
+    return is_core
+
+def expand_clusters(points, is_core, radius, chunk_size):
+    core_index = np.flatnonzero(is_core)
+    labels = np.full(len(points), -1, dtype=np.int64)
+    if len(core_index) == 0:
+        return labels
+    
+    core_tree = BallTree(points[core_index], metric='haversine')
+    core_position = np.full(len(points), -1, dtype=np.int64)
+    core_position[core_index] = np.arange(len(core_index))
+    
+    component = np.arange(len(core_index))
+    border_core = np.full(len(points), -1, dtype=np.int64)
+    
+    for start in range(0, len(points), chunk_size):
+        stop = min(start + chunk_size, len(points))
+        neighbors = core_tree.query_radius(points[start:stop], r=radius)
+        flat, owner, lengths = flatten_neighbors(neighbors)
+        
+        from_core = is_core[start:stop][owner]
+        component = merge_components(component, core_position[start + owner[from_core]], flat[from_core])
+        
+        has_core_neighbor = (lengths > 0) & ~is_core[start:stop]
+        first_neighbor = np.cumsum(lengths) - lengths
+        border_core[start:stop][has_core_neighbor] = flat[first_neighbor[has_core_neighbor]]
+    
+    labels[core_index] = component
+    is_border = border_core >= 0
+    labels[is_border] = component[border_core[is_border]]
+    
+    clustered = labels >= 0
+    _, compact = np.unique(labels[clustered], return_inverse=True)
+    labels[clustered] = compact.ravel()
+    return labels
+
+def haversine_dbscan(latitude, longitude, eps_km, min_samples, memory_budget_mb=1024,
+                     chunk_size=None, deduplicate=True):
+    points = to_radians(latitude, longitude)
+    
+    if deduplicate:
+        points, inverse, weights = deduplicate_points(points)
+    else:
+        inverse = None
+        weights = np.ones(len(points), dtype=np.float64)
+    
+    radius = km_to_radians(eps_km)
+    tree = BallTree(points, metric='haversine')
+    
+    if chunk_size is None:
+        chunk_size = estimate_chunk_size(tree, points, radius, memory_budget_mb)
+    
+    is_core = find_core_points(tree, points, weights, radius, min_samples, chunk_size)
+    del tree
+    labels = expand_clusters(points, is_core, radius, chunk_size)
+    
+    if inverse is not None:
+        return labels[inverse], is_core[inverse]
+    return labels, is_core
@@ -0,0 +1,59 @@
+import numpy as np
+from sqlalchemy import text
+
+STREAM_CHUNK_ROWS = 50000
+
+# Numeric columns are cast in Postgres so rows arrive as float/int rather than Decimal objects
+SQL_CASTS = {
+    'float32': 'REAL',
+    'float64': 'DOUBLE PRECISION',
+    'int32': 'INTEGER',
+    'int64': 'BIGINT'
+}
+
+def select_columns(columns):
+    # columns maps output name -> (SQL expression, NumPy dtype)
+    selected = []
+    for name, (expression, dtype) in columns.items():
+        cast = SQL_CASTS.get(np.dtype(dtype).name)
+        selected.append(f"CAST({expression} AS {cast}) AS {name}" if cast else f"{expression} AS {name}")
+    return ',\n    '.join(selected)
+
+def column_query(columns, source):
+    return f"SELECT\n    {select_columns(columns)}\n{source}"
+
+def to_columns(rows, columns):
+    values = list(zip(*rows))
+    return {
+        name: np.asarray(values[position], dtype=dtype)
+        for position, (name, (_, dtype)) in enumerate(columns.items())
+    }
+
+def stream_columns(engine, columns, source, params=None, chunksize=STREAM_CHUNK_ROWS):
+    # stream_results makes psycopg2 use a named server-side cursor, so only one chunk is held client-side
+    query = text(column_query(columns, source))
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        result = conn.execute(query, params or {})
+        while True:
+            rows = result.fetchmany(chunksize)
+            if not rows:
+                break
+            yield to_columns(rows, columns)
+
+def read_columns(engine, columns, source, params=None, chunksize=STREAM_CHUNK_ROWS, size_hint=None):
+    # Fills one typed buffer per column chunk by chunk; buffers grow by doubling unless size_hint is exact
+    capacity = size_hint or chunksize
+    buffers = {name: np.empty(capacity, dtype=dtype) for name, (_, dtype) in columns.items()}
+    n_rows = 0
+    for chunk in stream_columns(engine, columns, source, params, chunksize):
+        size = len(next(iter(chunk.values())))
+        if n_rows + size > capacity:
+            capacity = max(capacity * 2, n_rows + size)
+            for name, buffer in buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:n_rows] = buffer[:n_rows]
+                buffers[name] = grown
+        for name, values in chunk.items():
+            buffers[name][n_rows:n_rows + size] = values
+        n_rows += size
+    return {name: buffer[:n_rows] for name, buffer in buffers.items()}
@@ -0,0 +1,97 @@
+import os
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+# Per-process defaults; <PREFIX>_POOL_SIZE etc. override them, e.g. DB_POOL_SIZE or MYSQL_POOL_SIZE
+POOL_DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_recycle': 1800,
+    'pool_timeout': 30
+}
+
+def env_flag(name):
+    return os.getenv(name, 'false').lower() in ('1', 'true', 'yes')
+
+def engine_options(prefix):
+    # <PREFIX>_PGBOUNCER=true hands pooling to pgbouncer (transaction mode): every checkout opens a
+    # fresh client connection to pgbouncer, so no server connection is held between transactions
+    if env_flag(f'{prefix}_PGBOUNCER'):
+        return {'poolclass': NullPool}
+    options = {name: int(os.getenv(f'{prefix}_{name.upper()}', default)) for name, default in POOL_DEFAULTS.items()}
+    options['pool_pre_ping'] = True
+    return options
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if hasattr(pool, 'checkedout'):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    return stats
+
+class EngineRegistry:
+    # One engine per name per process. Tasks and requests share it instead of building a pool each
+    # call; a forked child drops the pools it inherited and opens its own connections
+    def __init__(self):
+        self.engines = {}
+        self.options = {}
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+    
+    def get(self, name, url, prefix='DB'):
+        self.reset_after_fork()
+        with self.lock:
+            engine = self.engines.get(name)
+            if engine is None:
+                options = engine_options(prefix)
+                engine = create_engine(url, **options)
+                self.engines[name] = engine
+                self.options[name] = options
+            return engine
+    
+    def register(self, name, engine, options=None):
+        # For engines built elsewhere, such as Flask-SQLAlchemy's
+        with self.lock:
+            self.engines[name] = engine
+            self.options[name] = options or {}
+        return engine
+    
+    def reset_after_fork(self):
+        if os.getpid() == self.pid:
+            return
+        # The child has a single thread, and the lock may have been copied while held
+        self.lock = threading.Lock()
+        # close=False: the parent still owns those sockets, the child just forgets them
+        for engine in self.engines.values():
+            engine.dispose(close=False)
+        self.pid = os.getpid()
+    
+    def dispose(self):
+        with self.lock:
+            for engine in self.engines.values():
+                engine.dispose()
+    
+    def stats(self):
+        stats = {}
+        for name, engine in list(self.engines.items()):
+            options = self.options.get(name, {})
+            entry = pool_stats(engine)
+            if 'pool_size' in options:
+                # Most server connections this process can hold on this engine
+                entry['max_connections'] = options['pool_size'] + options['max_overflow']
+            stats[name] = entry
+        return {'pid': self.pid, 'engines': stats}
+
+engines = EngineRegistry()
+
+# Covers every fork (gunicorn workers, Celery prefork children, multiprocessing); the explicit
+# post_fork / worker_process_init hooks run the same reset and are no-ops afterwards
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=engines.reset_after_fork)
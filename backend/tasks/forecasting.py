@@ -0,0 +1,181 @@
+import hashlib
+import json
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+ARIMA_ORDER = (2, 1, 2)
+MIN_SERIES_YEARS = 10
+MIN_SERIES_FIRES = 20
+SERIES_BATCH_SIZE = 25
+CONFIDENCE_LEVEL = 0.95
+
+# '*' stands for "all": '*/*' is the national series, 'CA/*' one state, '*/B' one size class, 'CA/B' both
+ALL = '*'
+
+SERIES_COUNTS_QUERY = """
+SELECT
+    state, fire_size_class, fire_year,
+    GROUPING(state) AS all_states,
+    GROUPING(fire_size_class) AS all_size_classes,
+    COUNT(*) AS fire_count
+FROM fire_incidents
+GROUP BY GROUPING SETS (
+    (fire_year),
+    (state, fire_year),
+    (fire_size_class, fire_year),
+    (state, fire_size_class, fire_year)
+)
+"""
+
+def build_series(counts):
+    # One column per series over a shared, gap-free range of years (years without fires count as 0)
+    counts = counts.copy()
+    state = counts['state'].where(counts['all_states'] == 0, ALL)
+    size_class = counts['fire_size_class'].where(counts['all_size_classes'] == 0, ALL)
+    counts['key'] = state.str.cat(size_class, sep='/')
+    counts = counts[state.notna() & size_class.notna()]
+    
+    if counts.empty:
+        return pd.DataFrame()
+    series = counts.pivot_table(index='fire_year', columns='key', values='fire_count', aggfunc='sum', fill_value=0)
+    years = range(int(series.index.min()), int(series.index.max()) + 1)
+    return series.reindex(years, fill_value=0).astype(np.float64)
+
+def series_hash(values, first_year, order, forecast_periods):
+    digest = hashlib.sha1()
+    digest.update(json.dumps([first_year, list(order), forecast_periods]).encode())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+def plan_forecasts(series, state, order=ARIMA_ORDER, forecast_periods=12):
+    # Unchanged series reuse the cached forecast; changed ones are refit, warm-started from cached params
+    first_year = int(series.index[0])
+    jobs, reused, skipped = [], [], []
+    for key in series.columns:
+        values = series[key].values
+        if values.sum() < MIN_SERIES_FIRES or len(values) < MIN_SERIES_YEARS:
+            skipped.append(key)
+            continue
+        
+        content_hash = series_hash(values, first_year, order, forecast_periods)
+        cached = state.get(key)
+        if cached is not None and cached.get('series_hash') == content_hash and cached.get('result'):
+            reused.append(cached['result'])
+            continue
+        
+        start_params = None
+        if cached is not None and tuple(cached.get('order', ())) == tuple(order):
+            start_params = cached.get('params')
+        jobs.append({
+            'key': key,
+            'first_year': first_year,
+            'counts': values.tolist(),
+            'series_hash': content_hash,
+            'start_params': start_params
+        })
+    return jobs, reused, skipped
+
+def fit_arima(endog, order, start_params=None):
+    model = ARIMA(endog, order=order)
+    if start_params is not None and len(start_params) == len(model.param_names):
+        try:
+            fitted = model.fit(start_params=np.asarray(start_params, dtype=np.float64))
+            if fitted.mle_retvals.get('converged', True) and np.isfinite(fitted.params).all():
+                return fitted, True
+        except Exception:
+            pass
+    return model.fit(), False
+
+def fit_series(job, order=ARIMA_ORDER, forecast_periods=12):
+    started = time.perf_counter()
+    endog = np.asarray(job['counts'], dtype=np.float64)
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        fitted, warm_started = fit_arima(endog, order, job.get('start_params'))
+        prediction = fitted.get_forecast(steps=forecast_periods)
+        forecast = np.clip(prediction.predicted_mean, 0, None)
+        interval = np.clip(prediction.conf_int(alpha=1 - CONFIDENCE_LEVEL), 0, None)
+    
+    return {
+        'key': job['key'],
+        'status': 'fitted',
+        'series_hash': job['series_hash'],
+        'first_forecast_year': job['first_year'] + len(endog),
+        'forecast': forecast.tolist(),
+        'lower_ci': interval[:, 0].tolist(),
+        'upper_ci': interval[:, 1].tolist(),
+        'params': np.asarray(fitted.params, dtype=np.float64).tolist(),
+        'aic': float(fitted.aic),
+        'bic': float(fitted.bic),
+        'converged': bool(fitted.mle_retvals.get('converged', True)),
+        'warm_started': warm_started,
+        'fit_seconds': time.perf_counter() - started
+    }
+
+def fit_series_batch(jobs, order=ARIMA_ORDER, forecast_periods=12):
+    results = []
+    for job in jobs:
+        try:
+            results.append(fit_series(job, order, forecast_periods))
+        except Exception as e:
+            results.append({'key': job['key'], 'status': 'failed', 'error': str(e)})
+    return results
+
+def batched(items, size=SERIES_BATCH_SIZE):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def update_forecast_state(state, results, order=ARIMA_ORDER):
+    for result in results:
+        if result.get('status') == 'fitted':
+            state[result['key']] = {
+                'series_hash': result['series_hash'],
+                'order': list(order),
+                'params': result['params'],
+                'result': result
+            }
+    return state
+
+def forecast_state_fingerprint(state):
+    # The fitted state is keyed by the series it was fit on, not by a fire_incidents snapshot
+    digest = hashlib.sha1()
+    for key in sorted(state):
+        digest.update(f"{key}:{state[key]['series_hash']};".encode())
+    return digest.hexdigest()
+
+def forecast_rows(results):
+    prediction_values, metadata = [], []
+    for result in results:
+        state, size_class = result['key'].split('/')
+        for step, value in enumerate(result['forecast']):
+            prediction_values.append(value)
+            metadata.append(json.dumps({
+                'series': result['key'],
+                'state': None if state == ALL else state,
+                'fire_size_class': None if size_class == ALL else size_class,
+                'forecast_year': result['first_forecast_year'] + step,
+                'lower_ci': result['lower_ci'][step],
+                'upper_ci': result['upper_ci'][step],
+                'aic': result['aic'],
+                'fit_seconds': round(result['fit_seconds'], 4)
+            }))
+    return np.asarray(prediction_values, dtype=np.float64), np.asarray(metadata, dtype=object)
+
+def fit_time_summary(fitted, wall_seconds):
+    fit_seconds = np.asarray([result['fit_seconds'] for result in fitted], dtype=np.float64)
+    if not len(fit_seconds):
+        return {'wall_seconds': round(wall_seconds, 3)}
+    slowest = sorted(fitted, key=lambda result: result['fit_seconds'], reverse=True)[:5]
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'total_fit_seconds': round(float(fit_seconds.sum()), 3),
+        'mean_fit_seconds': round(float(fit_seconds.mean()), 4),
+        'p95_fit_seconds': round(float(np.percentile(fit_seconds, 95)), 4),
+        'max_fit_seconds': round(float(fit_seconds.max()), 4),
+        'series_per_second': round(len(fit_seconds) / wall_seconds, 2) if wall_seconds > 0 else None,
+        'slowest_series': {result['key']: round(result['fit_seconds'], 4) for result in slowest}
+    }
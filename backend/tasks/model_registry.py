@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import time
+
+import joblib
+from sqlalchemy import text
+
+LATEST_FILE = 'latest.json'
+
+# Cheap stand-in for hashing every row: any insert, delete or update changes one of these (updated_at
+# is kept current by the fire_incidents_touch_updated_at trigger)
+FINGERPRINT_QUERY = """
+SELECT COUNT(*), MAX(created_at), MAX(updated_at)
+FROM fire_incidents
+{where}
+"""
+
+def data_fingerprint(conn, where=''):
+    row = conn.execute(text(FINGERPRINT_QUERY.format(where=where))).first()
+    return hashlib.sha1(json.dumps([str(value) for value in row]).encode()).hexdigest()
+
+def parameters_key(parameters):
+    return hashlib.sha1(json.dumps(parameters, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+class ModelRegistry:
+    # Artifacts live at <root>/<kind>/<parameters key>-<fingerprint>.joblib; latest.json points at the
+    # most recent one per kind and per parameter set
+    def __init__(self, root, keep=5):
+        self.root = root
+        self.keep = keep
+    
+    def kind_dir(self, kind):
+        return os.path.join(self.root, kind)
+    
+    def artifact_name(self, parameters, fingerprint):
+        return f"{parameters_key(parameters)}-{fingerprint[:16]}.joblib"
+    
+    def read_latest(self, kind):
+        try:
+            with open(os.path.join(self.kind_dir(kind), LATEST_FILE)) as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def write_latest(self, kind, latest):
+        path = os.path.join(self.kind_dir(kind), LATEST_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump(latest, handle, indent=2)
+        os.replace(tmp_path, path)
+    
+    def load_file(self, kind, name):
+        try:
+            return joblib.load(os.path.join(self.kind_dir(kind), name))
+        except (FileNotFoundError, EOFError):
+            return None
+    
+    def save(self, kind, model, parameters, fingerprint, metadata=None):
+        os.makedirs(self.kind_dir(kind), exist_ok=True)
+        name = self.artifact_name(parameters, fingerprint)
+        artifact = {
+            'kind': kind,
+            'model': model,
+            'parameters': parameters,
+            'fingerprint': fingerprint,
+            'metadata': metadata or {},
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        
+        path = os.path.join(self.kind_dir(kind), name)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+        
+        latest = self.read_latest(kind)
+        entry = {'file': name, 'fingerprint': fingerprint, 'created_at': artifact['created_at'], **(metadata or {})}
+        latest['latest'] = entry
+        latest.setdefault('by_parameters', {})[parameters_key(parameters)] = entry
+        self.write_latest(kind, latest)
+        self.prune(kind)
+        return artifact
+    
+    def load(self, kind, parameters, fingerprint):
+        # Exact hit only: same parameters and unchanged data
+        artifact = self.load_file(kind, self.artifact_name(parameters, fingerprint))
+        if artifact is None or artifact['fingerprint'] != fingerprint:
+            return None
+        return artifact
+    
+    def latest(self, kind, parameters=None):
+        latest = self.read_latest(kind)
+        entry = latest.get('latest') if parameters is None else latest.get('by_parameters', {}).get(parameters_key(parameters))
+        if entry is None:
+            return None
+        return self.load_file(kind, entry['file'])
+    
+    def prune(self, kind):
+        latest = self.read_latest(kind)
+        referenced = {entry['file'] for entry in latest.get('by_parameters', {}).values()}
+        artifacts = sorted(
+            (name for name in os.listdir(self.kind_dir(kind)) if name.endswith('.joblib')),
+            key=lambda name: os.path.getmtime(os.path.join(self.kind_dir(kind), name)),
+            reverse=True
+        )
+        for name in artifacts[self.keep:]:
+            if name not in referenced:
+                os.remove(os.path.join(self.kind_dir(kind), name))
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+
+# Both functions are defined in init.sql / migrations/partition_fire_incidents.sql
+ENSURE_PARTITIONS = text("SELECT ensure_fire_incident_partitions(CAST(:years AS INTEGER[]))")
+SPLIT_DEFAULT_PARTITION = text("SELECT split_default_fire_incident_partition()")
+
+# Row estimate for the whole table, summed over the partitions: autovacuum never analyzes a
+# partitioned parent, so its own reltuples is usually missing or stale
+ESTIMATED_ROWS = text("""
+SELECT COALESCE(SUM(reltuples) FILTER (WHERE reltuples > 0), 0)::bigint
+FROM pg_class
+WHERE (oid = 'fire_incidents'::regclass AND relkind <> 'p')
+   OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'fire_incidents'::regclass)
+""")
+
+def ensure_partitions(conn, years):
+    years = sorted({int(year) for year in years})
+    if not years:
+        return 0
+    return conn.execute(ENSURE_PARTITIONS, {'years': years}).scalar()
+
+def split_default_partition(conn):
+    return conn.execute(SPLIT_DEFAULT_PARTITION).scalar()
+
+def estimated_rows(conn):
+    return int(conn.execute(ESTIMATED_ROWS).scalar() or 0)
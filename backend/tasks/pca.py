@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from tasks.bulk_writer import write_analysis_results, json_metadata
+
+PCA_FEATURES = ['latitude', 'longitude', 'fire_size_acres', 'fire_year']
+PCA_COMPONENTS = 2
+MIN_PCA_POINTS = 50
+
+PCA_POINTS_WHERE = "WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND fire_size_acres IS NOT NULL"
+
+PCA_FEATURE_COLUMNS = {
+    'latitude': ('latitude', np.float32),
+    'longitude': ('longitude', np.float32),
+    'fire_size_acres': ('fire_size_acres', np.float32),
+    'fire_year': ('fire_year', np.int32)
+}
+
+PCA_POINT_COLUMNS = {
+    'id': ('id', object),
+    'created_at': ('created_at', 'datetime64[us]'),
+    **PCA_FEATURE_COLUMNS
+}
+
+PCA_POINTS_SOURCE = f"""
+FROM fire_incidents
+{PCA_POINTS_WHERE}
+"""
+
+# Fires without a projection in the run, whenever their insert committed
+NEW_PCA_POINTS_SOURCE = PCA_POINTS_SOURCE + """AND NOT EXISTS (
+    SELECT 1 FROM analysis_results r
+    WHERE r.run_id = :run_id AND r.fire_incident_id = fire_incidents.id
+)
+"""
+
+def feature_matrix(chunk):
+    return np.stack([chunk[name].astype(np.float32, copy=False) for name in PCA_FEATURES], axis=1)
+
+def chunk_rows(chunk):
+    return len(next(iter(chunk.values())))
+
+def fit_scaler(chunks):
+    scaler = StandardScaler()
+    for chunk in chunks:
+        scaler.partial_fit(feature_matrix(chunk))
+    return scaler
+
+def fit_incremental_pca(chunks, scaler, n_components=PCA_COMPONENTS):
+    pca = IncrementalPCA(n_components=n_components)
+    for chunk in chunks:
+        # partial_fit needs at least n_components rows; only a short final chunk can fall below that
+        if chunk_rows(chunk) >= n_components:
+            pca.partial_fit(scaler.transform(feature_matrix(chunk)))
+    return pca
+
+def project(model, features):
+    return model['pca'].transform(model['scaler'].transform(features))
+
+def project_points(bind, run_id, model, chunks):
+    # Projects and writes one chunk at a time through an engine or an open transaction's connection;
+    # returns the row count and the newest created_at seen
+    n_points, watermark = 0, None
+    for chunk in chunks:
+        projected = project(model, feature_matrix(chunk))
+        write_analysis_results(
+            bind, run_id, 'pca_analysis',
+            fire_incident_ids=chunk['id'],
+            metadata=json_metadata(pc1=projected[:, 0], pc2=projected[:, 1])
+        )
+        n_points += len(projected)
+        newest = chunk['created_at'].max()
+        if pd.notna(newest) and (watermark is None or newest > watermark):
+            watermark = newest
+    return n_points, pd.Timestamp(watermark).isoformat() if watermark is not None else None
+
+def model_summary(model):
+    pca, scaler = model['pca'], model['scaler']
+    return {
+        'explained_variance_ratio': pca.explained_variance_ratio_.tolist(),
+        'feature_importance': dict(zip(model['features'], pca.components_[0].tolist())),
+        'components': pca.components_.tolist(),
+        'scaler_mean': scaler.mean_.tolist(),
+        'scaler_scale': scaler.scale_.tolist(),
+        'n_components': int(pca.n_components_)
+    }
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from tasks.data_access import read_columns
+
+RISK_LOOKBACK_YEARS = 5
+RISK_VALID_DAYS = 180
+RISK_UPSERT_BATCH_ROWS = 1000
+
+RISK_WEIGHTS = {'fire_count': 0.4, 'avg_size': 0.3, 'max_size': 0.3}
+
+# Lower bounds on the 0-10 score, checked from the top
+RISK_LEVELS = [(8, 'Extreme'), (6, 'High'), (4, 'Moderate')]
+DEFAULT_RISK_LEVEL = 'Low'
+
+RISK_COLUMNS = {
+    'state': ('state', object),
+    'county': ('county', object),
+    'avg_size': ('AVG(fire_size_acres)', np.float32),
+    'fire_count': ('COUNT(*)', np.int32),
+    'max_size': ('MAX(fire_size_acres)', np.float32)
+}
+
+REGIONS_SOURCE = """
+FROM fire_incidents
+WHERE fire_year >= :since AND county IS NOT NULL AND state IS NOT NULL {state_filter}
+GROUP BY state, county
+"""
+
+# Same thresholds as risk_thresholds(), computed in Postgres so per-state runs can share national ones
+RISK_THRESHOLDS_QUERY = """
+WITH regions AS (
+    SELECT state, COUNT(*) AS fire_count, AVG(fire_size_acres) AS avg_size, MAX(fire_size_acres) AS max_size
+    FROM fire_incidents
+    WHERE fire_year >= :since AND county IS NOT NULL AND state IS NOT NULL
+    GROUP BY state, county
+)
+SELECT
+    MAX(fire_count)::float8 AS max_fire_count,
+    MAX(avg_size)::float8 AS max_avg_size,
+    MAX(max_size)::float8 AS max_max_size,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY fire_count) AS median_fire_count,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY avg_size) AS median_avg_size,
+    percentile_cont(0.9) WITHIN GROUP (ORDER BY max_size) AS p90_max_size,
+    array_agg(DISTINCT state) AS states
+FROM regions
+"""
+
+RISK_UPSERT = """
+INSERT INTO risk_assessments
+    (region_id, state, county, risk_level, risk_score, primary_risk_factors,
+     assessment_date, valid_until, created_by)
+VALUES
+    (:region_id, :state, :county, :risk_level, :risk_score, :primary_risk_factors,
+     :assessment_date, :valid_until, :created_by)
+ON DUPLICATE KEY UPDATE
+    state = VALUES(state),
+    county = VALUES(county),
+    risk_level = VALUES(risk_level),
+    risk_score = VALUES(risk_score),
+    primary_risk_factors = VALUES(primary_risk_factors),
+    valid_until = VALUES(valid_until),
+    created_by = VALUES(created_by)
+"""
+
+def lookback_start(today=None):
+    return (today or date.today()).year - RISK_LOOKBACK_YEARS
+
+def read_regions(engine, since, state=None):
+    source = REGIONS_SOURCE.format(state_filter='AND state = :state' if state else '')
+    return pd.DataFrame(read_columns(engine, RISK_COLUMNS, source, params={'since': since, 'state': state}))
+
+def read_thresholds(engine, since):
+    with engine.connect() as conn:
+        row = conn.execute(text(RISK_THRESHOLDS_QUERY), {'since': since}).mappings().first()
+    thresholds = {name: float(value) if value is not None else float('nan') for name, value in row.items() if name != 'states'}
+    return thresholds, sorted(row['states'] or [])
+
+def risk_thresholds(regions):
+    return {
+        'max_fire_count': float(np.nanmax(regions['fire_count'])),
+        'max_avg_size': float(np.nanmax(regions['avg_size'])),
+        'max_max_size': float(np.nanmax(regions['max_size'])),
+        'median_fire_count': float(np.nanmedian(regions['fire_count'])),
+        'median_avg_size': float(np.nanmedian(regions['avg_size'])),
+        'p90_max_size': float(np.nanquantile(regions['max_size'], 0.9))
+    }
+
+def ratio(values, maximum):
+    if not maximum:
+        return np.zeros(len(values))
+    return np.nan_to_num(np.asarray(values, dtype=np.float64) / maximum)
+
+def region_ids(states, counties):
+    # One id per county: upper-cased, non-alphanumerics collapsed to '_', within VARCHAR(50)
+    # migrations/mysql_risk_assessments_region_key.sql rewrites ids of the older state + 3-letter form
+    county_keys = counties.str.upper().str.replace(r'[^A-Z0-9]+', '_', regex=True).str.strip('_')
+    return (states.str.upper() + '_' + county_keys).str.slice(0, 50)
+
+def risk_factor_lists(masks):
+    # JSON arrays assembled column-wise: each mask contributes its quoted name where it is set
+    factors = pd.Series('', index=next(iter(masks.values())).index)
+    for name, mask in masks.items():
+        factors = factors + np.where(mask, f'"{name}", ', '')
+    return '[' + factors.str.slice(0, -2) + ']'
+
+def score_regions(regions, thresholds):
+    score = (
+        ratio(regions['fire_count'], thresholds['max_fire_count']) * RISK_WEIGHTS['fire_count'] +
+        ratio(regions['avg_size'], thresholds['max_avg_size']) * RISK_WEIGHTS['avg_size'] +
+        ratio(regions['max_size'], thresholds['max_max_size']) * RISK_WEIGHTS['max_size']
+    ) * 10
+    
+    scored = regions[['state', 'county']].copy()
+    scored['region_id'] = region_ids(regions['state'], regions['county'])
+    scored['risk_score'] = np.round(score, 2)
+    scored['risk_level'] = np.select(
+        [score >= bound for bound, _ in RISK_LEVELS],
+        [level for _, level in RISK_LEVELS],
+        default=DEFAULT_RISK_LEVEL
+    )
+    scored['primary_risk_factors'] = risk_factor_lists({
+        'high_fire_frequency': regions['fire_count'] > thresholds['median_fire_count'],
+        'large_average_fire_size': regions['avg_size'] > thresholds['median_avg_size'],
+        'extreme_fire_events': regions['max_size'] > thresholds['p90_max_size']
+    })
+    return scored
+
+def upsert_assessments(engine, scored, assessment_date, created_by='automated_system',
+                       batch_rows=RISK_UPSERT_BATCH_ROWS):
+    rows = scored[['region_id', 'state', 'county', 'risk_level', 'risk_score', 'primary_risk_factors']].assign(
+        risk_score=scored['risk_score'].astype(float),
+        assessment_date=assessment_date,
+        valid_until=assessment_date + timedelta(days=RISK_VALID_DAYS),
+        created_by=created_by
+    ).to_dict('records')
+    
+    # executemany on a plain INSERT ... VALUES is rewritten by the MySQL driver into multi-row statements
+    with engine.begin() as conn:
+        for start in range(0, len(rows), batch_rows):
+            conn.execute(text(RISK_UPSERT), rows[start:start + batch_rows])
+    return len(rows)
@@ -0,0 +1,160 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import orjson
+import pandas as pd
+
+# Web Mercator tiles, each split into TILE_BINS x TILE_BINS aggregation cells
+TILE_BINS = 32
+MAX_LATITUDE = 85.05112878
+MAX_ZOOM = 22
+
+CURRENT_LINK = 'current'
+MANIFEST_FILE = 'manifest.json'
+
+# Coordinates and sizes arrive as float32 and missing values are filled in Postgres
+TILE_POINT_COLUMNS = {
+    'latitude': ('latitude', np.float32),
+    'longitude': ('longitude', np.float32),
+    'fire_size_acres': ('COALESCE(fire_size_acres, 0)', np.float32),
+    'cause_description': ("COALESCE(cause_description, 'Unknown')", object)
+}
+
+TILE_POINTS_SOURCE = """
+FROM fire_incidents
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+TILE_BBOX_SOURCE = """
+FROM fire_incidents
+WHERE latitude BETWEEN :south AND :north AND longitude BETWEEN :west AND :east
+"""
+
+def tile_in_range(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+def tile_bounds(z, x, y):
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n))))
+    south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n))))
+    return float(west), float(south), float(east), float(north)
+
+def global_bins(latitude, longitude, z, bins=TILE_BINS):
+    # Bin coordinates over the whole world at zoom z; tile = bin // bins, cell = bin % bins
+    n = 2 ** z * bins
+    latitude = np.radians(np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    longitude = np.asarray(longitude, dtype=np.float64)
+    
+    bin_x = np.floor((longitude + 180.0) / 360.0 * n).astype(np.int64)
+    bin_y = np.floor((1.0 - np.arcsinh(np.tan(latitude)) / np.pi) / 2.0 * n).astype(np.int64)
+    return np.clip(bin_x, 0, n - 1), np.clip(bin_y, 0, n - 1)
+
+def tile_points(columns):
+    # columns as read with TILE_POINT_COLUMNS; causes become one categorical shared by every zoom
+    return pd.DataFrame({
+        'latitude': columns['latitude'],
+        'longitude': columns['longitude'],
+        'fire_size_acres': columns['fire_size_acres'],
+        'cause_description': pd.Categorical(columns['cause_description'])
+    })
+
+def aggregate_bins(frame, z, bins=TILE_BINS):
+    bin_x, bin_y = global_bins(frame['latitude'].values, frame['longitude'].values, z, bins)
+    keyed = pd.DataFrame({
+        'tile_x': bin_x // bins,
+        'tile_y': bin_y // bins,
+        'bx': bin_x % bins,
+        'by': bin_y % bins,
+        'latitude': frame['latitude'].values.astype(np.float64),
+        'longitude': frame['longitude'].values.astype(np.float64),
+        'acres': frame['fire_size_acres'].values.astype(np.float64),
+        'cause': frame['cause_description'].values
+    })
+    keys = ['tile_x', 'tile_y', 'bx', 'by']
+    
+    grouped = keyed.groupby(keys).agg(
+        count=('acres', 'size'),
+        acres=('acres', 'sum'),
+        lat=('latitude', 'mean'),
+        lon=('longitude', 'mean')
+    )
+    
+    causes = keyed.groupby(keys + ['cause'], observed=True).size().rename('fires').reset_index()
+    causes = causes.sort_values(keys + ['fires', 'cause'], ascending=[True] * 4 + [False, True])
+    grouped['cause'] = causes.drop_duplicates(keys).set_index(keys)['cause']
+    
+    return grouped.reset_index()
+
+CELL_COLUMNS = ['bx', 'by', 'count', 'acres', 'lat', 'lon', 'cause']
+
+def tile_payload(z, x, y, cells=None, bins=TILE_BINS):
+    if cells is None or len(cells) == 0:
+        cells = pd.DataFrame(columns=CELL_COLUMNS)
+    return {
+        'z': z,
+        'x': x,
+        'y': y,
+        'bins': bins,
+        'bounds': tile_bounds(z, x, y),
+        'total_fires': int(cells['count'].sum()),
+        'cells': cells[CELL_COLUMNS].round(
+            {'acres': 2, 'lat': 5, 'lon': 5}
+        ).to_dict('records')
+    }
+
+def encode_tile(payload):
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def tile_path(root, z, x, y):
+    return os.path.join(root, str(z), str(x), f"{y}.json")
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, CURRENT_LINK, MANIFEST_FILE), 'rb') as handle:
+            return orjson.loads(handle.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+def write_tile_pyramid(root, frame, max_zoom, bins=TILE_BINS, dataset_version=None):
+    generation = f"gen-{int(time.time() * 1000)}"
+    build_dir = os.path.join(root, generation)
+    tile_count = 0
+    
+    for z in range(max_zoom + 1):
+        cells = aggregate_bins(frame, z, bins)
+        for (x, y), tile_cells in cells.groupby(['tile_x', 'tile_y']):
+            path = tile_path(build_dir, z, int(x), int(y))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as handle:
+                handle.write(encode_tile(tile_payload(z, int(x), int(y), tile_cells, bins)))
+            tile_count += 1
+    
+    manifest = {
+        'generation': generation,
+        'max_zoom': max_zoom,
+        'bins': bins,
+        'tile_count': tile_count,
+        'total_fires': len(frame),
+        'dataset_version': dataset_version,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    with open(os.path.join(build_dir, MANIFEST_FILE), 'wb') as handle:
+        handle.write(orjson.dumps(manifest))
+    
+    # Readers follow the symlink, so swapping it publishes the new pyramid atomically
+    link = os.path.join(root, CURRENT_LINK)
+    tmp_link = f"{link}.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(generation, tmp_link)
+    os.replace(tmp_link, link)
+    
+    for name in os.listdir(root):
+        if name.startswith('gen-') and name != generation:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    
+    return manifest
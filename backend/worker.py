@@ -1,17 +1,33 @@
-from celery import Celery
+from celery import Celery, chord, group
+from celery.signals import worker_process_init
 import pandas as pd
 import numpy as np
-from sklearn.cluster import DBSCAN
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from statsmodels.tsa.arima.model import ARIMA
 import psycopg2
 import pymysql
-from sqlalchemy import create_engine
+from sqlalchemy import text
 import os
 import json
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 import redis
+from tasks.clustering import haversine_dbscan
+from tasks.cluster_index import ClusterIndex
+from tasks.bulk_writer import write_analysis_results
+from tasks.tiles import write_tile_pyramid, tile_points, TILE_POINT_COLUMNS, TILE_POINTS_SOURCE
+from tasks.forecasting import (
+    ARIMA_ORDER, CONFIDENCE_LEVEL, MIN_SERIES_YEARS, SERIES_COUNTS_QUERY, build_series, plan_forecasts,
+    fit_series_batch, batched, update_forecast_state, forecast_state_fingerprint, forecast_rows, fit_time_summary
+)
+from tasks.engines import engines
+from tasks.partitions import ensure_partitions, split_default_partition
+from tasks.model_registry import ModelRegistry, data_fingerprint
+from tasks.data_access import stream_columns, read_columns
+from tasks.risk import read_regions, read_thresholds, risk_thresholds, score_regions, upsert_assessments, lookback_start
+from tasks.pca import (
+    PCA_FEATURES, PCA_COMPONENTS, MIN_PCA_POINTS, PCA_POINTS_WHERE, PCA_FEATURE_COLUMNS, PCA_POINT_COLUMNS,
+    PCA_POINTS_SOURCE, NEW_PCA_POINTS_SOURCE,
+    fit_scaler, fit_incremental_pca, project_points, model_summary
+)
 
 celery = Celery('wildfire_worker')
 
@@ -25,270 +41,581 @@ celery.conf.update(
     enable_utc=True,
     task_routes={
         'worker.process_clustering': {'queue': 'analytics'},
+        'worker.process_incremental_clustering': {'queue': 'analytics'},
+        'worker.process_pca_analysis': {'queue': 'analytics'},
+        'worker.precompute_tiles': {'queue': 'analytics'},
         'worker.process_forecasting': {'queue': 'analytics'},
+        'worker.fit_forecast_batch': {'queue': 'analytics'},
+        'worker.finalize_forecasting': {'queue': 'analytics'},
+        'worker.fail_forecasting': {'queue': 'analytics'},
         'worker.process_risk_assessment': {'queue': 'risk'},
+        'worker.process_risk_assessment_by_state': {'queue': 'risk'},
         'worker.generate_reports': {'queue': 'reports'}
     }
 )
 
+MODELS_DIR = os.getenv('MODELS_DIR', '/app/models')
+CLUSTERING_MEMORY_BUDGET_MB = int(os.getenv('CLUSTERING_MEMORY_BUDGET_MB', 1024))
+CLUSTERING_FULL_REBUILD_DAYS = int(os.getenv('CLUSTERING_FULL_REBUILD_DAYS', 7))
+ANALYSIS_RUN_TIMEOUT_MINUTES = int(os.getenv('ANALYSIS_RUN_TIMEOUT_MINUTES', 120))
+PCA_FULL_REFIT_DAYS = int(os.getenv('PCA_FULL_REFIT_DAYS', 30))
+TILES_DIR = os.getenv('TILES_DIR', '/app/data/tiles')
+TILE_MAX_ZOOM = int(os.getenv('TILE_MAX_ZOOM', 8))
+
+registry = ModelRegistry(MODELS_DIR)
+
+CLUSTERING_POINTS_WHERE = "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+
+CLUSTERING_COLUMNS = {
+    'id': ('id', object),
+    'latitude': ('latitude', np.float32),
+    'longitude': ('longitude', np.float32),
+    'created_at': ('created_at', 'datetime64[us]')
+}
+
 def get_postgres_engine():
-    return create_engine(os.getenv('DATABASE_URL'))
+    return engines.get('postgres', os.getenv('DATABASE_URL'), 'DB')
 
 def get_mysql_engine():
-    return create_engine(os.getenv('MYSQL_URL'))
+    return engines.get('mysql', os.getenv('MYSQL_URL'), 'MYSQL')
+
+@worker_process_init.connect
+def reset_engines(**kwargs):
+    # Prefork children must not share the pooled connections of the process they were forked from
+    engines.reset_after_fork()
+
+def forecast_parameters(forecast_periods):
+    return {'order': list(ARIMA_ORDER), 'forecast_periods': forecast_periods}
+
+def start_analysis_run(engine, analysis_type, parameters, run_id=None):
+    with engine.begin() as conn:
+        if run_id is None:
+            return conn.execute(text("""
+                INSERT INTO analysis_runs (analysis_type, status, parameters, started_at)
+                VALUES (:analysis_type, 'running', CAST(:parameters AS JSONB), NOW())
+                RETURNING id
+            """), {'analysis_type': analysis_type, 'parameters': json.dumps(parameters)}).scalar()
+        
+        conn.execute(text("""
+            UPDATE analysis_runs
+            SET status = 'running', parameters = CAST(:parameters AS JSONB),
+                started_at = NOW(), error_message = NULL
+            WHERE id = :run_id
+        """), {'run_id': run_id, 'parameters': json.dumps(parameters)})
+        return run_id
+
+def complete_analysis_run(engine, run_id, summary):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE analysis_runs
+            SET status = 'completed', summary = CAST(:summary AS JSONB), completed_at = NOW()
+            WHERE id = :run_id
+        """), {'run_id': run_id, 'summary': json.dumps(summary)})
+
+def fail_analysis_run(engine, run_id, message):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE analysis_runs
+            SET status = 'failed', error_message = :message, completed_at = NOW()
+            WHERE id = :run_id
+        """), {'run_id': run_id, 'message': message})
 
 @celery.task(bind=True)
-def process_clustering(self, min_samples=5, eps=0.5):
+def process_clustering(self, min_samples=5, eps_km=10.0, run_id=None, deduplicate=True):
+    engine = get_postgres_engine()
+    parameters = {
+        'eps_km': eps_km,
+        'min_samples': min_samples,
+        'metric': 'haversine',
+        'deduplicate': deduplicate
+    }
+    
     try:
-        engine = get_postgres_engine()
-        
-        query = """
-        SELECT id, latitude, longitude, fire_size_acres, fire_year
-        FROM fire_incidents 
-        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
-        """
-        
-        df = pd.read_sql(query, engine)
+        run_id = start_analysis_run(engine, 'dbscan_clustering', parameters, run_id)
         
-        if len(df) < min_samples:
-            return {'status': 'insufficient_data', 'message': 'Not enough data points for clustering'}
+        with engine.connect() as conn:
+            fingerprint = data_fingerprint(conn, CLUSTERING_POINTS_WHERE)
         
-        coordinates = df[['latitude', 'longitude']].values
-        
-        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-        clusters = dbscan.fit_predict(coordinates)
+        # Same parameters over unchanged data: the stored index already holds every label
+        artifact = registry.load('dbscan_clustering', parameters, fingerprint)
+        if artifact is not None:
+            index = artifact['model']
+        else:
+            points = read_columns(engine, CLUSTERING_COLUMNS, f"FROM fire_incidents {CLUSTERING_POINTS_WHERE}")
+            
+            if len(points['id']) < min_samples:
+                result = {'status': 'insufficient_data', 'message': 'Not enough data points for clustering'}
+                fail_analysis_run(engine, run_id, result['message'])
+                return result
+            
+            latitude = points['latitude']
+            longitude = points['longitude']
+            
+            clusters, is_core = haversine_dbscan(
+                latitude,
+                longitude,
+                eps_km=eps_km,
+                min_samples=min_samples,
+                memory_budget_mb=CLUSTERING_MEMORY_BUDGET_MB,
+                deduplicate=deduplicate
+            )
+            
+            watermark = pd.Timestamp(points['created_at'].max()).isoformat()
+            index = ClusterIndex.build(
+                points['id'], latitude, longitude, clusters, is_core,
+                eps_km, min_samples, watermark
+            )
+        
+        registry.save('dbscan_clustering', index, parameters, fingerprint, metadata={'run_id': run_id})
+        
+        write_analysis_results(
+            engine, run_id, 'dbscan_clustering',
+            fire_incident_ids=index.ids,
+            cluster_ids=index.labels
+        )
+        
+        summary = {
+            'n_clusters': index.n_clusters,
+            'n_noise_points': index.n_noise,
+            'total_points': len(index.ids),
+            'revision': 0,
+            'watermark': index.watermark,
+            'model_reused': artifact is not None
+        }
+        complete_analysis_run(engine, run_id, summary)
         
-        df['cluster'] = clusters
+        return {'status': 'completed', 'run_id': run_id, **summary}
         
-        cluster_results = []
-        for _, row in df.iterrows():
-            cluster_results.append({
-                'fire_incident_id': row['id'],
-                'analysis_type': 'dbscan_clustering',
-                'cluster_id': int(row['cluster']),
-                'metadata': json.dumps({
-                    'eps': eps,
-                    'min_samples': min_samples,
-                    'fire_size_acres': float(row['fire_size_acres']) if pd.notna(row['fire_size_acres']) else None
-                })
+    except Exception as e:
+        if run_id is not None:
+            fail_analysis_run(engine, run_id, str(e))
+        self.retry(countdown=60, max_retries=3)
+        return {'status': 'error', 'message': str(e)}
+
+@celery.task(bind=True)
+def process_incremental_clustering(self):
+    engine = get_postgres_engine()
+    update_run_id = None
+    
+    try:
+        with engine.connect() as conn:
+            # An incremental update is tracked as its own run; runs with no progress past the timeout are lost
+            active_run = conn.execute(text("""
+                SELECT id FROM analysis_runs
+                WHERE analysis_type IN ('dbscan_clustering', 'dbscan_incremental')
+                    AND status IN ('pending', 'running')
+                    AND COALESCE(started_at, created_at) > NOW() - make_interval(mins => :timeout)
+                LIMIT 1
+            """), {'timeout': ANALYSIS_RUN_TIMEOUT_MINUTES}).scalar()
+            base_run = conn.execute(text("""
+                SELECT id, parameters, summary, completed_at FROM analysis_runs
+                WHERE analysis_type = 'dbscan_clustering' AND status = 'completed'
+                ORDER BY created_at DESC
+                LIMIT 1
+            """)).mappings().first()
+        
+        if active_run is not None:
+            return {'status': 'skipped', 'message': 'A clustering run is already in progress', 'run_id': active_run}
+        
+        parameters = base_run['parameters'] if base_run else {}
+        summary = dict(base_run['summary'] or {}) if base_run else {}
+        artifact = registry.latest('dbscan_clustering', parameters) if base_run else None
+        
+        # The index must be the one saved after the last committed revision of the base run's results;
+        # anything else (e.g. the process died between commit and save) means a full recluster
+        rebuild_before = datetime.utcnow() - timedelta(days=CLUSTERING_FULL_REBUILD_DAYS)
+        if (base_run is None or base_run['completed_at'] < rebuild_before
+                or artifact is None or artifact['metadata'].get('run_id') != base_run['id']
+                or artifact['metadata'].get('revision', 0) != summary.get('revision', 0)):
+            task = process_clustering.delay(**{
+                name: parameters[name] for name in ('eps_km', 'min_samples', 'deduplicate') if name in parameters
             })
+            return {'status': 'full_recluster_scheduled', 'task_id': task.id}
+        
+        run_id = base_run['id']
+        index = artifact['model']
+        update_run_id = start_analysis_run(engine, 'dbscan_incremental', {'base_run_id': run_id})
+        
+        with engine.connect() as conn:
+            fingerprint = data_fingerprint(conn, CLUSTERING_POINTS_WHERE)
+        
+        # New fires are the ones without a result row in the base run, whenever their insert committed
+        new_fires = read_columns(
+            engine, CLUSTERING_COLUMNS,
+            f"""FROM fire_incidents {CLUSTERING_POINTS_WHERE}
+                AND NOT EXISTS (
+                    SELECT 1 FROM analysis_results r
+                    WHERE r.run_id = :run_id AND r.fire_incident_id = fire_incidents.id
+                )
+                ORDER BY id""",
+            params={'run_id': run_id}
+        )
+        
+        if not len(new_fires['id']):
+            complete_analysis_run(engine, update_run_id, {'base_run_id': run_id, 'new_points': 0})
+            return {'status': 'up_to_date', 'run_id': run_id}
+        
+        watermark = pd.Timestamp(new_fires['created_at'].max()).isoformat()
+        update = index.add_points(
+            new_fires['id'],
+            new_fires['latitude'],
+            new_fires['longitude'],
+            watermark=max(watermark, index.watermark or watermark)
+        )
+        
+        summary.update({
+            'n_clusters': index.n_clusters,
+            'n_noise_points': index.n_noise,
+            'total_points': len(index.ids),
+            'revision': summary.get('revision', 0) + 1,
+            'watermark': index.watermark,
+            'last_incremental_update': {
+                'update_run_id': update_run_id,
+                'updated_at': datetime.utcnow().isoformat(),
+                'new_points': len(new_fires['id']),
+                'new_core_points': update['new_core_points'],
+                'merged_clusters': len(update['merges']),
+                'adopted_points': len(update['adopted_ids'])
+            }
+        })
+        
+        # Relabels, new result rows and the summary commit together, so a failure leaves the base run as it was
+        with engine.begin() as conn:
+            if update['merges']:
+                conn.execute(text("""
+                    UPDATE analysis_results SET cluster_id = :new_label
+                    WHERE run_id = :run_id AND cluster_id = :old_label
+                """), [
+                    {'run_id': run_id, 'old_label': old_label, 'new_label': new_label}
+                    for old_label, new_label in update['merges'].items()
+                ])
+            
+            if len(update['adopted_ids']):
+                conn.execute(text("""
+                    UPDATE analysis_results SET cluster_id = :label
+                    WHERE run_id = :run_id AND fire_incident_id = :fire_id
+                """), [
+                    {'run_id': run_id, 'fire_id': fire_id, 'label': int(label)}
+                    for fire_id, label in zip(update['adopted_ids'], update['adopted_labels'])
+                ])
+            
+            write_analysis_results(
+                conn, run_id, 'dbscan_clustering',
+                fire_incident_ids=new_fires['id'],
+                cluster_ids=update['new_labels']
+            )
+            
+            conn.execute(text("""
+                UPDATE analysis_runs SET summary = CAST(:summary AS JSONB) WHERE id = :run_id
+            """), {'run_id': run_id, 'summary': json.dumps(summary)})
         
-        results_df = pd.DataFrame(cluster_results)
-        results_df.to_sql('analysis_results', engine, if_exists='append', index=False)
+        registry.save('dbscan_clustering', index, parameters, fingerprint,
+                      metadata={'run_id': run_id, 'revision': summary['revision']})
         
-        n_clusters = len(set(clusters)) - (1 if -1 in clusters else 0)
-        n_noise = list(clusters).count(-1)
+        update_summary = {'base_run_id': run_id, 'revision': summary['revision'], **summary['last_incremental_update']}
+        complete_analysis_run(engine, update_run_id, update_summary)
         
-        return {
-            'status': 'completed',
-            'n_clusters': n_clusters,
-            'n_noise_points': n_noise,
-            'total_points': len(df)
-        }
+        return {'status': 'completed', 'run_id': run_id, **summary['last_incremental_update']}
         
     except Exception as e:
+        if update_run_id is not None:
+            fail_analysis_run(engine, update_run_id, str(e))
         self.retry(countdown=60, max_retries=3)
         return {'status': 'error', 'message': str(e)}
 
 @celery.task(bind=True)
-def process_pca_analysis(self):
+def process_pca_analysis(self, run_id=None, full_refit=False):
+    engine = get_postgres_engine()
+    parameters = {'n_components': PCA_COMPONENTS, 'features': PCA_FEATURES, 'scaling': 'standard', 'method': 'incremental'}
+    
     try:
-        engine = get_postgres_engine()
+        if run_id is None and not full_refit:
+            with engine.connect() as conn:
+                base_run = conn.execute(text("""
+                    SELECT id, summary, completed_at FROM analysis_runs
+                    WHERE analysis_type = 'pca_analysis' AND status = 'completed'
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """)).mappings().first()
+            
+            artifact = registry.latest('pca_analysis', parameters)
+            refit_before = datetime.utcnow() - timedelta(days=PCA_FULL_REFIT_DAYS)
+            if (base_run is not None and base_run['completed_at'] >= refit_before
+                    and artifact is not None and artifact['metadata'].get('run_id') == base_run['id']):
+                return project_new_pca_points(engine, base_run, artifact, parameters)
+        
+        run_id = start_analysis_run(engine, 'pca_analysis', parameters, run_id)
+        
+        with engine.connect() as conn:
+            fingerprint = data_fingerprint(conn, PCA_POINTS_WHERE)
+            n_points = conn.execute(text(f"SELECT COUNT(*) FROM fire_incidents {PCA_POINTS_WHERE}")).scalar()
+        
+        if n_points < MIN_PCA_POINTS:
+            result = {'status': 'insufficient_data', 'message': f'Need at least {MIN_PCA_POINTS} data points for PCA'}
+            fail_analysis_run(engine, run_id, result['message'])
+            return result
+        
+        # Unchanged data: project with the stored scaler and components instead of refitting
+        artifact = registry.load('pca_analysis', parameters, fingerprint)
+        if artifact is not None:
+            model = artifact['model']
+        else:
+            # Two streamed passes (scaler, then components) keep memory at one chunk regardless of table size
+            scaler = fit_scaler(stream_columns(engine, PCA_FEATURE_COLUMNS, PCA_POINTS_SOURCE))
+            pca = fit_incremental_pca(stream_columns(engine, PCA_FEATURE_COLUMNS, PCA_POINTS_SOURCE), scaler)
+            model = {'scaler': scaler, 'pca': pca, 'features': PCA_FEATURES}
+        
+        total_points, watermark = project_points(
+            engine, run_id, model, stream_columns(engine, PCA_POINT_COLUMNS, PCA_POINTS_SOURCE)
+        )
+        model['watermark'] = watermark
+        registry.save('pca_analysis', model, parameters, fingerprint, metadata={'run_id': run_id})
+        
+        summary = {
+            **model_summary(model),
+            'total_points': total_points,
+            'revision': 0,
+            'watermark': watermark,
+            'model_reused': artifact is not None
+        }
+        complete_analysis_run(engine, run_id, summary)
         
-        query = """
-        SELECT id, latitude, longitude, fire_size_acres, fire_year
-        FROM fire_incidents 
-        WHERE latitude IS NOT NULL AND longitude IS NOT NULL 
-        AND fire_size_acres IS NOT NULL
-        """
-        
-        df = pd.read_sql(query, engine)
-        
-        if len(df) < 50:
-            return {'status': 'insufficient_data', 'message': 'Need at least 50 data points for PCA'}
-        
-        features = df[['latitude', 'longitude', 'fire_size_acres', 'fire_year']].values
-        
-        scaler = StandardScaler()
-        features_scaled = scaler.fit_transform(features)
-        
-        pca = PCA(n_components=2)
-        pca_result = pca.fit_transform(features_scaled)
-        
-        pca_results = []
-        for i, row in df.iterrows():
-            pca_results.append({
-                'fire_incident_id': row['id'],
-                'analysis_type': 'pca_analysis',
-                'metadata': json.dumps({
-                    'pc1': float(pca_result[i][0]),
-                    'pc2': float(pca_result[i][1]),
-                    'explained_variance_ratio': pca.explained_variance_ratio_.tolist(),
-                    'feature_importance': {
-                        'latitude': float(pca.components_[0][0]),
-                        'longitude': float(pca.components_[0][1]),
-                        'fire_size_acres': float(pca.components_[0][2]),
-                        'fire_year': float(pca.components_[0][3])
-                    }
-                })
-            })
+        return {'status': 'completed', 'run_id': run_id, **summary}
         
-        results_df = pd.DataFrame(pca_results)
-        results_df.to_sql('analysis_results', engine, if_exists='append', index=False)
+    except Exception as e:
+        if run_id is not None:
+            fail_analysis_run(engine, run_id, str(e))
+        self.retry(countdown=60, max_retries=3)
+        return {'status': 'error', 'message': str(e)}
+
+def project_new_pca_points(engine, base_run, artifact, parameters):
+    # Fires added since the last fit are projected onto the stored components: cost grows with new rows only
+    run_id = base_run['id']
+    model = artifact['model']
+    with engine.connect() as conn:
+        fingerprint = data_fingerprint(conn, PCA_POINTS_WHERE)
+    
+    if fingerprint == artifact['fingerprint']:
+        return {'status': 'up_to_date', 'run_id': run_id}
+    
+    summary = dict(base_run['summary'] or {})
+    # Projections and the summary commit together, so a retry after a failure never writes a fire twice
+    with engine.begin() as conn:
+        new_points, watermark = project_points(
+            conn, run_id, model,
+            stream_columns(engine, PCA_POINT_COLUMNS, NEW_PCA_POINTS_SOURCE, params={'run_id': run_id})
+        )
+        if new_points:
+            summary.update({
+                'total_points': summary.get('total_points', 0) + new_points,
+                'revision': summary.get('revision', 0) + 1,
+                'watermark': max(watermark, summary.get('watermark') or watermark),
+                'last_incremental_update': {
+                    'updated_at': datetime.utcnow().isoformat(),
+                    'new_points': new_points
+                }
+            })
+            conn.execute(text("""
+                UPDATE analysis_runs SET summary = CAST(:summary AS JSONB) WHERE id = :run_id
+            """), {'run_id': run_id, 'summary': json.dumps(summary)})
+    
+    if new_points:
+        model['watermark'] = summary['watermark']
+    # Only updates or deletes since the fit leave nothing to project; the new fingerprint is still recorded
+    registry.save('pca_analysis', model, parameters, fingerprint, metadata={'run_id': run_id})
+    
+    if not new_points:
+        return {'status': 'up_to_date', 'run_id': run_id}
+    return {'status': 'completed', 'run_id': run_id, 'new_points': new_points, **summary}
+
+@celery.task(bind=True)
+def process_forecasting(self, forecast_periods=12, run_id=None):
+    engine = get_postgres_engine()
+    parameters = {
+        'order': list(ARIMA_ORDER),
+        'forecast_periods': forecast_periods,
+        'series': ['national', 'state', 'fire_size_class', 'state x fire_size_class']
+    }
+    
+    try:
+        run_id = start_analysis_run(engine, 'arima_forecast', parameters, run_id)
+        started_at = time.time()
+        
+        series = build_series(pd.read_sql(SERIES_COUNTS_QUERY, engine))
+        if len(series) < MIN_SERIES_YEARS:
+            result = {'status': 'insufficient_data', 'message': f'Need at least {MIN_SERIES_YEARS} years of data for forecasting'}
+            fail_analysis_run(engine, run_id, result['message'])
+            return result
+        
+        artifact = registry.latest('arima_forecast', forecast_parameters(forecast_periods))
+        state = artifact['model'] if artifact is not None else {}
+        jobs, reused, skipped = plan_forecasts(series, state, ARIMA_ORDER, forecast_periods)
+        
+        # One subtask per batch of series on the analytics queue; the callback writes every forecast at once
+        callback = finalize_forecasting.s(run_id, reused, len(skipped), forecast_periods, started_at)
+        # A header task that dies (lost worker, unserializable result) skips the callback entirely
+        callback.on_error(fail_forecasting.s(run_id))
+        if jobs:
+            chord(
+                fit_forecast_batch.s(batch, ARIMA_ORDER, forecast_periods) for batch in batched(jobs)
+            )(callback)
+        else:
+            callback.delay([])
         
         return {
-            'status': 'completed',
-            'explained_variance_ratio': pca.explained_variance_ratio_.tolist(),
-            'n_components': 2,
-            'total_points': len(df)
+            'status': 'queued',
+            'run_id': run_id,
+            'series': len(series.columns),
+            'fitting': len(jobs),
+            'reused': len(reused),
+            'skipped': len(skipped)
         }
         
     except Exception as e:
+        if run_id is not None:
+            fail_analysis_run(engine, run_id, str(e))
         self.retry(countdown=60, max_retries=3)
         return {'status': 'error', 'message': str(e)}
 
+@celery.task
+def fit_forecast_batch(jobs, order, forecast_periods):
+    return fit_series_batch(jobs, tuple(order), forecast_periods)
+
+@celery.task
+def fail_forecasting(request, exc, traceback, run_id):
+    # Chord error callback: called with the failed task's request and exception
+    fail_analysis_run(get_postgres_engine(), run_id, f"Forecast batch {request.id} failed: {exc!r}")
+
 @celery.task(bind=True)
-def process_forecasting(self, forecast_periods=12):
+def finalize_forecasting(self, batch_results, run_id, reused, skipped, forecast_periods, started_at):
+    engine = get_postgres_engine()
+    
     try:
-        engine = get_postgres_engine()
-        
-        query = """
-        SELECT fire_year, COUNT(*) as fire_count
-        FROM fire_incidents 
-        GROUP BY fire_year 
-        ORDER BY fire_year
-        """
-        
-        df = pd.read_sql(query, engine)
-        
-        if len(df) < 10:
-            return {'status': 'insufficient_data', 'message': 'Need at least 10 years of data for forecasting'}
-        
-        time_series = df.set_index('fire_year')['fire_count']
-        
-        model = ARIMA(time_series, order=(2, 1, 2))
-        fitted_model = model.fit()
-        
-        forecast = fitted_model.forecast(steps=forecast_periods)
-        forecast_ci = fitted_model.get_forecast(steps=forecast_periods).conf_int()
-        
-        forecast_results = []
-        current_year = df['fire_year'].max()
-        
-        for i in range(forecast_periods):
-            forecast_year = current_year + i + 1
-            forecast_results.append({
-                'analysis_type': 'arima_forecast',
-                'prediction_value': float(forecast.iloc[i]),
-                'confidence_score': 0.95,
-                'metadata': json.dumps({
-                    'forecast_year': forecast_year,
-                    'lower_ci': float(forecast_ci.iloc[i, 0]),
-                    'upper_ci': float(forecast_ci.iloc[i, 1]),
-                    'model_params': {
-                        'order': (2, 1, 2),
-                        'aic': float(fitted_model.aic),
-                        'bic': float(fitted_model.bic)
-                    }
-                })
-            })
-        
-        results_df = pd.DataFrame(forecast_results)
-        results_df.to_sql('analysis_results', engine, if_exists='append', index=False)
-        
-        return {
-            'status': 'completed',
+        results = [result for batch in batch_results for result in batch]
+        fitted = [result for result in results if result['status'] == 'fitted']
+        failed = {result['key']: result['error'] for result in results if result['status'] == 'failed'}
+        
+        parameters = forecast_parameters(forecast_periods)
+        artifact = registry.latest('arima_forecast', parameters)
+        state = update_forecast_state(artifact['model'] if artifact is not None else {}, fitted, ARIMA_ORDER)
+        registry.save('arima_forecast', state, parameters, forecast_state_fingerprint(state), metadata={'run_id': run_id})
+        
+        forecasts = sorted(fitted + reused, key=lambda result: result['key'])
+        prediction_values, metadata = forecast_rows(forecasts)
+        if len(prediction_values):
+            write_analysis_results(
+                engine, run_id, 'arima_forecast',
+                prediction_values=prediction_values,
+                confidence_scores=np.full(len(prediction_values), CONFIDENCE_LEVEL),
+                metadata=metadata
+            )
+        
+        summary = {
+            'series_forecast': len(forecasts),
+            'series_fitted': len(fitted),
+            'series_reused': len(reused),
+            'series_skipped': skipped,
+            'series_failed': len(failed),
+            'warm_started': sum(result['warm_started'] for result in fitted),
+            'not_converged': sum(not result['converged'] for result in fitted),
             'forecast_periods': forecast_periods,
-            'model_aic': float(fitted_model.aic),
-            'forecast_values': forecast.tolist()
+            'rows_written': len(prediction_values),
+            **fit_time_summary(fitted, time.time() - started_at)
         }
+        if failed:
+            summary['failures'] = dict(list(failed.items())[:20])
+        complete_analysis_run(engine, run_id, summary)
+        
+        return {'status': 'completed', 'run_id': run_id, **summary}
         
     except Exception as e:
-        self.retry(countdown=60, max_retries=3)
+        fail_analysis_run(engine, run_id, str(e))
         return {'status': 'error', 'message': str(e)}
 
 @celery.task(bind=True)
-def process_risk_assessment(self, state=None):
+def process_risk_assessment(self, state=None, thresholds=None):
     try:
         mysql_engine = get_mysql_engine()
         postgres_engine = get_postgres_engine()
+        started_at = time.time()
         
-        current_year = datetime.now().year
-        
-        if state:
-            fire_query = f"""
-            SELECT state, county, AVG(fire_size_acres) as avg_size,
-                   COUNT(*) as fire_count,
-                   MAX(fire_size_acres) as max_size
-            FROM fire_incidents 
-            WHERE fire_year >= {current_year - 5} AND state = '{state}'
-            GROUP BY state, county
-            """
-        else:
-            fire_query = f"""
-            SELECT state, county, AVG(fire_size_acres) as avg_size,
-                   COUNT(*) as fire_count,
-                   MAX(fire_size_acres) as max_size
-            FROM fire_incidents 
-            WHERE fire_year >= {current_year - 5}
-            GROUP BY state, county
-            """
-        
-        df = pd.read_sql(fire_query, postgres_engine)
-        
-        df['risk_score'] = (
-            (df['fire_count'] / df['fire_count'].max()) * 0.4 +
-            (df['avg_size'] / df['avg_size'].max()) * 0.3 +
-            (df['max_size'] / df['max_size'].max()) * 0.3
-        ) * 10
-        
-        def get_risk_level(score):
-            if score >= 8: return 'Extreme'
-            elif score >= 6: return 'High'
-            elif score >= 4: return 'Moderate'
-            else: return 'Low'
-        
-        df['risk_level'] = df['risk_score'].apply(get_risk_level)
-        
-        risk_assessments = []
-        for _, row in df.iterrows():
-            risk_factors = []
-            if row['fire_count'] > df['fire_count'].median():
-                risk_factors.append('high_fire_frequency')
-            if row['avg_size'] > df['avg_size'].median():
-                risk_factors.append('large_average_fire_size')
-            if row['max_size'] > df['max_size'].quantile(0.9):
-                risk_factors.append('extreme_fire_events')
-            
-            risk_assessments.append({
-                'region_id': f"{row['state']}_{row['county'][:3].upper()}",
-                'state': row['state'],
-                'county': row['county'],
-                'risk_level': row['risk_level'],
-                'risk_score': float(row['risk_score']),
-                'primary_risk_factors': json.dumps(risk_factors),
-                'assessment_date': datetime.now().date(),
-                'valid_until': (datetime.now() + timedelta(days=180)).date(),
-                'created_by': 'automated_system'
-            })
+        regions = read_regions(postgres_engine, lookback_start(), state)
+        if regions.empty:
+            return {'status': 'insufficient_data', 'state': state, 'message': 'No fires with a county in the lookback window'}
         
-        results_df = pd.DataFrame(risk_assessments)
-        results_df.to_sql('risk_assessments', mysql_engine, if_exists='append', index=False)
+        # Fanned-out state runs receive national thresholds so their scores stay comparable
+        scored = score_regions(regions, thresholds or risk_thresholds(regions))
+        assessments = upsert_assessments(mysql_engine, scored, date.today())
         
         return {
             'status': 'completed',
-            'assessments_created': len(risk_assessments),
-            'high_risk_counties': len(df[df['risk_level'].isin(['High', 'Extreme'])])
+            'state': state,
+            'assessments_created': assessments,
+            'high_risk_counties': int(scored['risk_level'].isin(['High', 'Extreme']).sum()),
+            'seconds': round(time.time() - started_at, 3)
         }
         
     except Exception as e:
         self.retry(countdown=60, max_retries=3)
         return {'status': 'error', 'message': str(e)}
 
+@celery.task(bind=True)
+def process_risk_assessment_by_state(self):
+    try:
+        thresholds, states = read_thresholds(get_postgres_engine(), lookback_start())
+        if not states:
+            return {'status': 'insufficient_data', 'message': 'No fires with a county in the lookback window'}
+        
+        result = group(process_risk_assessment.s(state, thresholds) for state in states).apply_async()
+        result.save()
+        
+        return {'status': 'queued', 'group_id': result.id, 'states': len(states), 'thresholds': thresholds}
+        
+    except Exception as e:
+        self.retry(countdown=60, max_retries=3)
+        return {'status': 'error', 'message': str(e)}
+
+@celery.task(bind=True)
+def precompute_tiles(self, max_zoom=None):
+    max_zoom = TILE_MAX_ZOOM if max_zoom is None else max_zoom
+    
+    try:
+        engine = get_postgres_engine()
+        redis_client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        # Read the version before the data so a concurrent write leaves the pyramid marked stale
+        dataset_version = int(redis_client.get('dataset:version') or 0)
+        
+        points = tile_points(read_columns(engine, TILE_POINT_COLUMNS, TILE_POINTS_SOURCE))
+        manifest = write_tile_pyramid(TILES_DIR, points, max_zoom, dataset_version=dataset_version)
+        
+        return {'status': 'completed', **manifest}
+        
+    except Exception as e:
+        self.retry(countdown=60, max_retries=3)
+        return {'status': 'error', 'message': str(e)}
+
+@celery.task
+def maintain_fire_partitions():
+    # Next year's partition exists before its first fire; years that still reached the default
+    # partition (a write from a process that skipped the check) are split out
+    engine = get_postgres_engine()
+    this_year = date.today().year
+    
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, [this_year, this_year + 1])
+        split = split_default_partition(conn)
+    
+    return {'status': 'completed', 'created': created, 'split_from_default': split}
+
+@celery.task
+def engine_pool_stats():
+    return engines.stats()
+
 @celery.task
 def scheduled_analytics():
-    process_clustering.delay()
+    process_incremental_clustering.delay()
     process_pca_analysis.delay()
+    precompute_tiles.delay()
     process_forecasting.delay()
     process_risk_assessment.delay()
     
@@ -299,6 +626,10 @@ celery.conf.beat_schedule = {
         'task': 'worker.scheduled_analytics',
         'schedule': 86400.0,
     },
+    'maintain-fire-partitions-daily': {
+        'task': 'worker.maintain_fire_partitions',
+        'schedule': 86400.0,
+    },
 }
 
 if __name__ == '__main__':
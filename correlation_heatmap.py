@@ -1,23 +1,24 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+# Compute the correlation matrix over the numeric columns
+def correlation_matrix(data):
+    return data.select_dtypes(include='number').corr()
 
-# Select numeric columns for correlation analysis
-numeric_columns = data.select_dtypes(include='number')
+def plot_correlation_heatmap(correlation_matrix, path="images/correlation_heatmap.png"):
+    # Create a heatmap
+    plt.figure(figsize=(12, 8))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', linewidths=0.5)
+    plt.title("Correlation Heatmap")
+    
+    # Save the image
+    plt.savefig(path)
 
-# Compute the correlation matrix
-correlation_matrix = numeric_columns.corr()
-
-# Create a heatmap
-plt.figure(figsize=(12, 8))
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', linewidths=0.5)
-plt.title("Correlation Heatmap")
-
-# Save the image
-plt.savefig("images/correlation_heatmap.png")
-
-# Show the plot
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(dataset.numeric_columns())
+    plot_correlation_heatmap(correlation_matrix(data))
+    
+    # Show the plot
+    plt.show()
@@ -1,7 +1,7 @@
-import pandas as pd
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+# Load the data from the Parquet cache of the CSV file
+data = dataset.load()
 
 # Get basic statistics about the dataset
 summary_stats = data.describe()
@@ -0,0 +1,164 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from fire_dates import normalize_dates
+
+SOURCE_CSV = os.getenv('FIRES_CSV', 'data/Fires_pruned.csv')
+CACHE_DIR = os.getenv('FIRES_PARQUET_DIR', 'data/parquet')
+
+# pyarrow.dataset skips files starting with '_', so the manifest can sit next to the partitions
+MANIFEST_FILE = '_manifest.json'
+CACHE_VERSION = 2
+
+PARTITION_COLUMNS = ['FIRE_YEAR', 'STATE']
+PARTITIONING = ds.partitioning(
+    pa.schema([('FIRE_YEAR', pa.int64()), ('STATE', pa.string())]),
+    flavor='hive'
+)
+
+# Text columns with fewer distinct values than this share of rows are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE)) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def write_manifest(cache_dir, manifest):
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w') as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_FILE))
+
+def source_signature(source):
+    stat = os.stat(source)
+    return {'source': os.path.abspath(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def is_fresh(manifest, source, cache_dir=CACHE_DIR):
+    if manifest is None or manifest.get('version') != CACHE_VERSION:
+        return False
+    signature = source_signature(source)
+    if all(manifest.get(key) == value for key, value in signature.items()):
+        return True
+    if manifest.get('size') != signature['size']:
+        return False
+    
+    # Same size but a new mtime (copied or touched): only rebuild if the content really changed
+    if manifest.get('sha256') != file_hash(source):
+        return False
+    manifest.update(signature)
+    write_manifest(cache_dir, manifest)
+    return True
+
+def categorize(data):
+    categorical = []
+    for column in data.select_dtypes(include=['object', 'string']).columns:
+        if column in PARTITION_COLUMNS:
+            continue
+        values = data[column].astype('string')
+        if values.nunique() < CATEGORY_MAX_RATIO * max(len(values), 1):
+            values = values.astype('category')
+            categorical.append(column)
+        data[column] = values
+    return data, categorical
+
+def build_cache(source=SOURCE_CSV, cache_dir=CACHE_DIR):
+    started = time.time()
+    data = pd.read_csv(source, low_memory=False)
+    if 'DISCOVERY_DATE' in data.columns:
+        # Julian day + DISCOVERY_TIME become one datetime64 column, so readers never reparse dates
+        data = normalize_dates(data)
+    columns = list(data.columns)
+    data, categorical = categorize(data)
+    data['STATE'] = data['STATE'].astype('string')
+    
+    build_dir = f"{cache_dir.rstrip(os.sep)}.build-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(data, preserve_index=False),
+        build_dir,
+        format='parquet',
+        partitioning=PARTITIONING,
+        basename_template='part-{i}.parquet',
+        max_partitions=100000
+    )
+    
+    manifest = dict(source_signature(source))
+    manifest.update({
+        'version': CACHE_VERSION,
+        'sha256': file_hash(source),
+        'rows': len(data),
+        'columns': columns,
+        'categorical': categorical,
+        'numeric': list(data.select_dtypes(include='number').columns),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'build_seconds': round(time.time() - started, 2)
+    })
+    write_manifest(build_dir, manifest)
+    
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(build_dir, cache_dir)
+    return manifest
+
+def ensure_cache(source=SOURCE_CSV, cache_dir=CACHE_DIR, rebuild=False):
+    manifest = read_manifest(cache_dir)
+    if rebuild or not is_fresh(manifest, source, cache_dir):
+        print(f"Building Parquet cache for {source} in {cache_dir}...")
+        manifest = build_cache(source, cache_dir)
+    return manifest
+
+def numeric_columns(source=SOURCE_CSV, cache_dir=CACHE_DIR):
+    return ensure_cache(source, cache_dir)['numeric']
+
+def load(columns=None, years=None, states=None, source=SOURCE_CSV, cache_dir=CACHE_DIR):
+    manifest = ensure_cache(source, cache_dir)
+    columns = manifest['columns'] if columns is None else list(columns)
+    missing = [column for column in columns if column not in manifest['columns']]
+    if missing:
+        raise KeyError(f"Columns not in {source}: {missing}")
+    
+    # Year/state filters prune whole partition directories before any file is opened
+    conditions = []
+    if years is not None:
+        conditions.append(ds.field('FIRE_YEAR').isin(list(years)))
+    if states is not None:
+        conditions.append(ds.field('STATE').isin(list(states)))
+    condition = None
+    for clause in conditions:
+        condition = clause if condition is None else condition & clause
+    
+    dataset = ds.dataset(cache_dir, format='parquet', partitioning=PARTITIONING)
+    data = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    if 'STATE' in data.columns:
+        data['STATE'] = data['STATE'].astype('category')
+    return data[columns]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the Parquet cache of the fires CSV')
+    parser.add_argument('--source', default=SOURCE_CSV)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args()
+    
+    manifest = ensure_cache(args.source, args.cache_dir, rebuild=args.rebuild)
+    print(f"{manifest['rows']} rows, {len(manifest['columns'])} columns, built {manifest['built_at']}")
+
+if __name__ == '__main__':
+    main()
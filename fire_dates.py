@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# FPA FOD stores DISCOVERY_DATE as a Julian day number; 2440587.5 is 1970-01-01T00:00
+JULIAN_UNIX_EPOCH = 2440587.5
+NS_PER_DAY = 86400 * 10 ** 9
+NS_PER_MINUTE = 60 * 10 ** 9
+NAT = np.iinfo(np.int64).min
+
+def julian_days(values):
+    # Whole days since 1970-01-01; NaN where the value is not a Julian day number
+    julian = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.floor(julian - JULIAN_UNIX_EPOCH + 1e-6)
+
+def calendar_days(values):
+    # Fallback for sources that already carry ISO dates instead of Julian day numbers
+    parsed = pd.to_datetime(pd.Series(values), errors='coerce')
+    days = parsed.to_numpy(dtype='datetime64[D]').astype(np.int64).astype(np.float64)
+    days[parsed.isna().to_numpy()] = np.nan
+    return days
+
+def year_doy_days(year, doy):
+    year = pd.to_numeric(pd.Series(year), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    doy = pd.to_numeric(pd.Series(doy), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(year) & (doy >= 1) & (doy <= 366)
+    
+    days = np.full(len(year), np.nan)
+    year_start = (year[valid].astype(np.int64) - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    days[valid] = year_start.astype(np.int64) + doy[valid] - 1
+    return days
+
+def time_of_day_minutes(values):
+    # DISCOVERY_TIME is HHMM, read as text or as a number
+    hhmm = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    hours, minutes = np.floor(hhmm / 100), np.mod(hhmm, 100)
+    valid = (hhmm >= 0) & (hours < 24) & (minutes < 60) & (hhmm == np.floor(hhmm))
+    return np.where(valid, hours * 60 + minutes, np.nan)
+
+def discovery_timestamps(date, doy=None, time=None, year=None):
+    days = julian_days(date)
+    missing = np.isnan(days)
+    if missing.any():
+        days[missing] = calendar_days(np.asarray(date, dtype=object)[missing])
+    if doy is not None and year is not None:
+        missing = np.isnan(days)
+        if missing.any():
+            days[missing] = year_doy_days(np.asarray(year)[missing], np.asarray(doy)[missing])
+    
+    minutes = np.zeros(len(days)) if time is None else np.nan_to_num(time_of_day_minutes(time))
+    valid = ~np.isnan(days)
+    
+    timestamps = np.full(len(days), NAT, dtype=np.int64)
+    timestamps[valid] = days[valid].astype(np.int64) * NS_PER_DAY + minutes[valid].astype(np.int64) * NS_PER_MINUTE
+    return timestamps.view('datetime64[ns]')
+
+def normalize_dates(frame, date='DISCOVERY_DATE', doy='DISCOVERY_DOY', time='DISCOVERY_TIME',
+                    year='FIRE_YEAR', target='DISCOVERY_TS'):
+    columns = frame.columns
+    frame[target] = discovery_timestamps(
+        frame[date],
+        doy=frame[doy] if doy in columns else None,
+        time=frame[time] if time in columns else None,
+        year=frame[year] if year in columns else None
+    )
+    return frame
+
+def time_strings(time):
+    # HH:MM text for TIME columns, None where the source time is missing or invalid
+    minutes = time_of_day_minutes(time)
+    valid = ~np.isnan(minutes)
+    whole = pd.Series(minutes[valid].astype(np.int64))
+    strings = np.full(len(minutes), None, dtype=object)
+    strings[valid] = ((whole // 60).astype(str).str.zfill(2) + ':' + (whole % 60).astype(str).str.zfill(2)).to_numpy(dtype=object)
+    return strings
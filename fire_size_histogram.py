@@ -1,18 +1,30 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+COLUMNS = ["FIRE_SIZE"]
 
-# Create a histogram of fire sizes
-plt.figure(figsize=(10, 6))
-plt.hist(data["FIRE_SIZE"], bins=50, edgecolor='k')
-plt.xlabel("Fire Size")
-plt.ylabel("Frequency")
-plt.title("Distribution of Fire Sizes")
+# Bin fire sizes up front, so only the 50 bin counts have to be passed around
+def fire_size_bins(data, bins=50):
+    return np.histogram(data["FIRE_SIZE"].dropna().values, bins=bins)
 
-# Save the image
-plt.savefig("images/fire_size_histogram.png")
+def plot_fire_size_histogram(size_bins, path="images/fire_size_histogram.png"):
+    counts, edges = size_bins
+    
+    # Create a histogram of fire sizes
+    plt.figure(figsize=(10, 6))
+    plt.hist(edges[:-1], bins=edges, weights=counts, edgecolor='k')
+    plt.xlabel("Fire Size")
+    plt.ylabel("Frequency")
+    plt.title("Distribution of Fire Sizes")
+    
+    # Save the image
+    plt.savefig(path)
 
-# Show the plot
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(COLUMNS)
+    plot_fire_size_histogram(fire_size_bins(data))
+    
+    # Show the plot
+    plt.show()
@@ -1,18 +1,23 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+COLUMNS = ["FIRE_YEAR", "FIRE_SIZE"]
 
-# Create a scatter plot of fire size vs. fire year
-plt.figure(figsize=(10, 6))
-plt.scatter(data["FIRE_YEAR"], data["FIRE_SIZE"], alpha=0.5, color='red')
-plt.xlabel("Fire Year")
-plt.ylabel("Fire Size")
-plt.title("Fire Size vs. Fire Year")
+def plot_fire_size_vs_year(points, path="images/fire_size_vs_year_scatter.png"):
+    # Create a scatter plot of fire size vs. fire year
+    plt.figure(figsize=(10, 6))
+    plt.scatter(points["FIRE_YEAR"], points["FIRE_SIZE"], alpha=0.5, color='red')
+    plt.xlabel("Fire Year")
+    plt.ylabel("Fire Size")
+    plt.title("Fire Size vs. Fire Year")
+    
+    # Save the image
+    plt.savefig(path)
 
-# Save the image
-plt.savefig("images/fire_size_vs_year_scatter.png")
-
-# Show the plot
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(COLUMNS)
+    plot_fire_size_vs_year(data)
+    
+    # Show the plot
+    plt.show()
@@ -5,48 +5,78 @@ import seaborn as sns
 import folium
 from sklearn.cluster import KMeans
 import numpy as np
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+COLUMNS = ["LATITUDE", "LONGITUDE"]
 
-# Create a directory to store the images if it doesn't exist
-if not os.path.exists("images"):
-    os.makedirs("images")
+def cluster_coordinates(coordinates, num_clusters=5):
+    # Perform K-Means clustering
+    kmeans = KMeans(n_clusters=num_clusters, random_state=0)
+    labels = kmeans.fit_predict(coordinates[['LATITUDE', 'LONGITUDE']])
+    return labels, kmeans.cluster_centers_
 
-# Extract latitude and longitude
-coordinates = data[['LATITUDE', 'LONGITUDE']]
+def plot_cluster_map(coordinates, labels, cluster_centers, path="images/kmeans_clusters_map.html"):
+    # Visualization 1: Scatter Plot of Clusters on Map
+    m = folium.Map(location=[coordinates['LATITUDE'].mean(), coordinates['LONGITUDE'].mean()], zoom_start=5)
+    
+    # Add markers for cluster centers
+    for i in range(len(cluster_centers)):
+        folium.Marker(location=[cluster_centers[i][0], cluster_centers[i][1]],
+                      icon=folium.DivIcon(html=f'<div>Cluster {i}</div>')).add_to(m)
+    
+    # Aggregate points into 0.25 degree cells per cluster and add one marker per cell
+    grid_size = 0.25
+    cells = pd.DataFrame({
+        'lat_cell': coordinates['LATITUDE'].values // grid_size,
+        'lon_cell': coordinates['LONGITUDE'].values // grid_size,
+        'Cluster': labels,
+        'LATITUDE': coordinates['LATITUDE'].values,
+        'LONGITUDE': coordinates['LONGITUDE'].values
+    }).groupby(['lat_cell', 'lon_cell', 'Cluster']).agg(
+        latitude=('LATITUDE', 'mean'),
+        longitude=('LONGITUDE', 'mean'),
+        fires=('LATITUDE', 'size')
+    ).reset_index()
+    
+    palette = sns.color_palette("Set2").as_hex()
+    radii = 2 + 2 * np.log1p(cells['fires'].values)
+    for latitude, longitude, cluster, fires, radius in zip(
+        cells['latitude'], cells['longitude'], cells['Cluster'], cells['fires'], radii
+    ):
+        folium.CircleMarker(location=[latitude, longitude], radius=float(radius),
+                            color=palette[cluster % len(palette)], fill=True,
+                            tooltip=f"Cluster {cluster}: {fires} fires").add_to(m)
+    
+    # Save the map as an HTML file
+    m.save(path)
 
-# Perform K-Means clustering
-num_clusters = 5  # You can adjust the number of clusters as needed
-kmeans = KMeans(n_clusters=num_clusters, random_state=0)
-data['Cluster'] = kmeans.fit_predict(coordinates)
+def plot_cluster_sizes(labels, path="images/kmeans_cluster_sizes_histogram.png"):
+    # Visualization 2: Histogram of Cluster Sizes
+    cluster_sizes = pd.Series(labels).value_counts()
+    
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x=cluster_sizes.index, y=cluster_sizes.values, palette="Set2")
+    plt.xlabel("Cluster")
+    plt.ylabel("Number of Incidents")
+    plt.title("Cluster Sizes")
+    plt.savefig(path)
 
-# Visualization 1: Scatter Plot of Clusters on Map
-cluster_centers = kmeans.cluster_centers_
-m = folium.Map(location=[data['LATITUDE'].mean(), data['LONGITUDE'].mean()], zoom_start=5)
+def plot_kmeans_clusters(coordinates, num_clusters=5,
+                         map_path="images/kmeans_clusters_map.html",
+                         sizes_path="images/kmeans_cluster_sizes_histogram.png"):
+    labels, cluster_centers = cluster_coordinates(coordinates, num_clusters)
+    plot_cluster_map(coordinates, labels, cluster_centers, map_path)
+    plot_cluster_sizes(labels, sizes_path)
 
-# Add markers for cluster centers
-for i in range(num_clusters):
-    folium.Marker(location=[cluster_centers[i][0], cluster_centers[i][1]], 
-                  icon=folium.DivIcon(html=f'<div>Cluster {i}</div>')).add_to(m)
-
-# Add markers for data points
-for index, row in data.iterrows():
-    folium.CircleMarker(location=[row['LATITUDE'], row['LONGITUDE']], 
-                        radius=3, color=sns.color_palette("Set2")[row['Cluster']], fill=True).add_to(m)
-
-# Save the map as an HTML file
-m.save("images/kmeans_clusters_map.html")
-
-# Visualization 2: Histogram of Cluster Sizes
-cluster_sizes = data['Cluster'].value_counts()
-
-plt.figure(figsize=(10, 6))
-sns.barplot(x=cluster_sizes.index, y=cluster_sizes.values, palette="Set2")
-plt.xlabel("Cluster")
-plt.ylabel("Number of Incidents")
-plt.title("Cluster Sizes")
-plt.savefig("images/kmeans_cluster_sizes_histogram.png")
-
-# Show the histograms
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(COLUMNS)
+    
+    # Create a directory to store the images if it doesn't exist
+    if not os.path.exists("images"):
+        os.makedirs("images")
+    
+    plot_kmeans_clusters(data)
+    
+    # Show the histograms
+    plt.show()
@@ -1,7 +1,7 @@
-import pandas as pd
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+# Load the data from the Parquet cache of the CSV file
+data = dataset.load()
 
 # Display the first few rows of the dataset to get an overview
 print(data.head())
@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import dataset
+from advanced_data_visualizations import heat_cells, plot_geospatial_heatmap, yearly_counts, plot_time_series_decomposition
+from correlation_heatmap import correlation_matrix, plot_correlation_heatmap
+from fire_size_histogram import fire_size_bins, plot_fire_size_histogram
+from fire_size_vs_year_scatter import plot_fire_size_vs_year
+from kmeans_clusters import plot_kmeans_clusters
+from reporting_agencies_bar_chart import top_reporting_agencies, plot_top_reporting_agencies
+from time_series_fires import fires_by_year_size, plot_time_series_fires
+
+MANIFEST_FILE = '.report_manifest.json'
+
+# render(*inputs, **outputs) draws one figure; outputs maps keyword arguments to file names
+Figure = namedtuple('Figure', ['name', 'render', 'inputs', 'outputs'])
+
+def report_columns():
+    return list(dict.fromkeys(dataset.numeric_columns() + ['DISCOVERY_TS', 'FIRE_SIZE_CLASS', 'NWCG_REPORTING_AGENCY']))
+
+def build_figures(data):
+    # Shared aggregates are computed once here; each figure only receives what it draws
+    coordinates = data[['LATITUDE', 'LONGITUDE']].dropna()
+    center = (data['LATITUDE'].mean(), data['LONGITUDE'].mean())
+    return [
+        Figure('fire_size_histogram', plot_fire_size_histogram,
+               (fire_size_bins(data),), {'path': 'fire_size_histogram.png'}),
+        Figure('fire_size_vs_year_scatter', plot_fire_size_vs_year,
+               (data[['FIRE_YEAR', 'FIRE_SIZE']],), {'path': 'fire_size_vs_year_scatter.png'}),
+        Figure('top_reporting_agencies', plot_top_reporting_agencies,
+               (top_reporting_agencies(data),), {'path': 'top_reporting_agencies_bar_chart.png'}),
+        Figure('correlation_heatmap', plot_correlation_heatmap,
+               (correlation_matrix(data),), {'path': 'correlation_heatmap.png'}),
+        Figure('time_series_fires', plot_time_series_fires,
+               (fires_by_year_size(data),), {'path': 'time_series_fires.png'}),
+        Figure('time_series_decomposition', plot_time_series_decomposition,
+               (yearly_counts(data),), {'path': 'time_series_decomposition.png'}),
+        Figure('geospatial_heatmap', plot_geospatial_heatmap,
+               (heat_cells(data), center), {'path': 'geospatial_heatmap.html'}),
+        Figure('kmeans_clusters', plot_kmeans_clusters,
+               (coordinates,), {'map_path': 'kmeans_clusters_map.html', 'sizes_path': 'kmeans_cluster_sizes_histogram.png'})
+    ]
+
+def update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr((type(value).__name__, value.shape, labels)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+def figure_hash(figure):
+    # The module source is part of the hash, so editing a plot re-renders it
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(inspect.getmodule(figure.render)).encode())
+    digest.update(figure.render.__name__.encode())
+    update_digest(digest, figure.inputs)
+    update_digest(digest, sorted(figure.outputs.items()))
+    return digest.hexdigest()
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE)) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_manifest(output_dir, manifest):
+    tmp_path = os.path.join(output_dir, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILE))
+
+def render_figure(render, inputs, outputs):
+    matplotlib.use('Agg')
+    started = time.time()
+    try:
+        render(*inputs, **outputs)
+    finally:
+        plt.close('all')
+    return time.time() - started
+
+def run_report(output_dir='images', workers=None, force=False):
+    started = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+    
+    data = dataset.load(report_columns())
+    figures = build_figures(data)
+    print(f"Loaded {len(data)} rows and computed figure inputs in {time.time() - started:.1f}s")
+    
+    manifest = read_manifest(output_dir)
+    stale = []
+    for figure in figures:
+        outputs = {key: os.path.join(output_dir, name) for key, name in figure.outputs.items()}
+        content_hash = figure_hash(figure)
+        unchanged = manifest.get(figure.name) == content_hash and all(os.path.exists(path) for path in outputs.values())
+        if unchanged and not force:
+            print(f"  {figure.name}: unchanged, skipped")
+            continue
+        stale.append((figure, outputs, content_hash))
+    
+    failed = []
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(render_figure, figure.render, figure.inputs, outputs): (figure, content_hash)
+                for figure, outputs, content_hash in stale
+            }
+            for future in as_completed(futures):
+                figure, content_hash = futures[future]
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    print(f"  {figure.name}: failed: {e}")
+                    manifest.pop(figure.name, None)
+                    failed.append(figure.name)
+                    continue
+                print(f"  {figure.name}: rendered in {elapsed:.1f}s")
+                manifest[figure.name] = content_hash
+        write_manifest(output_dir, manifest)
+    
+    print(f"Report finished in {time.time() - started:.1f}s: {len(stale) - len(failed)} rendered, "
+          f"{len(figures) - len(stale)} unchanged, {len(failed)} failed")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Render every analysis figure from one load of the dataset')
+    parser.add_argument('--output-dir', default='images')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='Re-render figures whose inputs are unchanged')
+    args = parser.parse_args()
+    
+    failed = run_report(args.output_dir, args.workers, args.force)
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
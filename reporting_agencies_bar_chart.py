@@ -1,22 +1,28 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+COLUMNS = ["NWCG_REPORTING_AGENCY"]
 
-# Get the top 10 reporting agencies by frequency
-top_reporting_agencies = data["NWCG_REPORTING_AGENCY"].value_counts().head(10)
+# Get the top reporting agencies by frequency
+def top_reporting_agencies(data, n=10):
+    return data["NWCG_REPORTING_AGENCY"].value_counts().head(n)
 
-# Create a bar chart
-plt.figure(figsize=(12, 6))
-top_reporting_agencies.plot(kind='bar', color='skyblue')
-plt.xlabel("Reporting Agency")
-plt.ylabel("Count")
-plt.title("Top 10 Reporting Agencies")
-plt.xticks(rotation=45)
+def plot_top_reporting_agencies(agencies, path="images/top_reporting_agencies_bar_chart.png"):
+    # Create a bar chart
+    plt.figure(figsize=(12, 6))
+    agencies.plot(kind='bar', color='skyblue')
+    plt.xlabel("Reporting Agency")
+    plt.ylabel("Count")
+    plt.title(f"Top {len(agencies)} Reporting Agencies")
+    plt.xticks(rotation=45)
+    
+    # Save the image
+    plt.savefig(path)
 
-# Save the image
-plt.savefig("images/top_reporting_agencies_bar_chart.png")
-
-# Show the plot
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(COLUMNS)
+    plot_top_reporting_agencies(top_reporting_agencies(data))
+    
+    # Show the plot
+    plt.show()
@@ -0,0 +1,226 @@
+from abc import ABC, abstractmethod
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from sqlalchemy import inspect, text
+
+CHECKPOINT_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS migration_checkpoints (
+    source VARCHAR(255) NOT NULL,
+    target_table VARCHAR(100) NOT NULL,
+    batch_offset BIGINT NOT NULL,
+    row_count INTEGER NOT NULL,
+    batch_rows INTEGER,
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source, target_table, batch_offset)
+)
+"""
+
+CHECKPOINT_INSERT = """
+INSERT INTO migration_checkpoints (source, target_table, batch_offset, row_count, batch_rows)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+# Errors raised when the server or client refuses LOAD DATA LOCAL INFILE
+MYSQL_LOCAL_INFILE_ERRORS = (1148, 2068, 3948)
+
+class LoadTarget(ABC):
+    def __init__(self, name, engine, table, columns, defaults=None, before_load=None):
+        self.name = name
+        self.engine = engine
+        self.table = table
+        self.columns = columns
+        self.defaults = defaults or {}
+        # Called as before_load(cursor, frame) inside the batch's transaction, ahead of the load
+        self.before_load = before_load
+        self.rows_written = 0
+        self.batches_written = 0
+        self.batches_skipped = 0
+        self.elapsed = 0.0
+    
+    def prepare(self, batch):
+        frame = batch.reindex(columns=[c for c in self.columns if c not in self.defaults])
+        for column, value in self.defaults.items():
+            frame[column] = value() if callable(value) else value
+        return frame[self.columns]
+    
+    def ensure_checkpoint_table(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(CHECKPOINT_TABLE_DDL))
+            # Tables created before batch_rows was recorded
+            if 'batch_rows' not in {column['name'] for column in inspect(conn).get_columns('migration_checkpoints')}:
+                conn.execute(text("ALTER TABLE migration_checkpoints ADD COLUMN batch_rows INTEGER"))
+    
+    def committed_batches(self, source):
+        # batch offset -> source rows per batch when it was committed (None if not recorded)
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT batch_offset, batch_rows FROM migration_checkpoints
+                WHERE source = :source AND target_table = :table
+            """), {'source': source, 'table': self.table})
+            return {row[0]: row[1] for row in rows}
+    
+    @abstractmethod
+    def load(self, cursor, frame):
+        pass
+    
+    def write_batch(self, source, offset, batch, batch_rows):
+        frame = self.prepare(batch)
+        started = time.perf_counter()
+        
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            if self.before_load is not None:
+                self.before_load(cursor, frame)
+            self.load(cursor, frame)
+            cursor.execute(CHECKPOINT_INSERT, (source, self.table, int(offset), len(frame), batch_rows))
+            cursor.close()
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
+        
+        self.elapsed += time.perf_counter() - started
+        self.rows_written += len(frame)
+        self.batches_written += 1
+    
+    @property
+    def rows_per_second(self):
+        return self.rows_written / self.elapsed if self.elapsed else 0.0
+
+class PostgresCopyTarget(LoadTarget):
+    def load(self, cursor, frame):
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+class MySQLLoadDataTarget(LoadTarget):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_local_infile = True
+    
+    def load(self, cursor, frame):
+        if self.use_local_infile:
+            try:
+                return self.load_data_local_infile(cursor, frame)
+            except Exception as e:
+                if getattr(e, 'args', (None,))[0] not in MYSQL_LOCAL_INFILE_ERRORS:
+                    raise
+                print(f"[{self.name}] LOAD DATA LOCAL INFILE unavailable ({e}), falling back to executemany")
+                self.use_local_infile = False
+        self.load_executemany(cursor, frame)
+    
+    def load_data_local_infile(self, cursor, frame):
+        escaped = frame.copy()
+        for column in escaped.select_dtypes(include=['object', 'string']).columns:
+            escaped[column] = escaped[column].str.replace('\\', '\\\\', regex=False)
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as handle:
+            escaped.to_csv(handle, index=False, header=False, na_rep='\\N', date_format='%Y-%m-%d %H:%M:%S')
+            path = handle.name
+        
+        try:
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s INTO TABLE {self.table}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(self.columns)})
+            """, (path,))
+        finally:
+            os.remove(path)
+    
+    def load_executemany(self, cursor, frame):
+        placeholders = ', '.join(['%s'] * len(self.columns))
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        cursor.executemany(
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})",
+            list(rows)
+        )
+
+def consume_batches(target, source, batches, batch_rows, committed, errors):
+    failed = False
+    while True:
+        item = batches.get()
+        if item is None:
+            return
+        if failed:
+            continue
+        
+        offset, batch = item
+        if offset in committed:
+            target.batches_skipped += 1
+            continue
+        
+        try:
+            target.write_batch(source, offset, batch, batch_rows)
+            print(f"[{target.name}] committed batch at offset {offset}: "
+                  f"{target.rows_written} rows, {target.rows_per_second:,.0f} rows/sec")
+        except Exception as e:
+            errors[target.name] = e
+            failed = True
+
+def run_parallel_load(source, batches, targets, batch_rows, queue_size=4):
+    # Offsets are source row positions: with another batch size they would no longer line up with the
+    # committed batches, and rows would be skipped or loaded twice
+    committed = {}
+    for target in targets:
+        target.ensure_checkpoint_table()
+        committed[target.name] = target.committed_batches(source)
+        other_sizes = {size for size in committed[target.name].values() if size != batch_rows}
+        if other_sizes:
+            recorded = ', '.join(sorted(str(size) for size in other_sizes if size is not None)) or 'unknown'
+            raise RuntimeError(
+                f"[{target.name}] {source} was partly loaded with a batch size of {recorded}, not {batch_rows}; "
+                f"rerun with that MIGRATION_BATCH_SIZE to resume"
+            )
+        if committed[target.name]:
+            print(f"[{target.name}] resuming, {len(committed[target.name])} batches already committed")
+    
+    queues = {target.name: queue.Queue(maxsize=queue_size) for target in targets}
+    errors = {}
+    workers = [
+        threading.Thread(
+            target=consume_batches,
+            args=(target, source, queues[target.name], batch_rows, committed[target.name], errors),
+            name=f"load-{target.name}"
+        )
+        for target in targets
+    ]
+    
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    
+    try:
+        for offset, batch in batches:
+            for target in targets:
+                queues[target.name].put((offset, batch))
+    finally:
+        for target in targets:
+            queues[target.name].put(None)
+        for worker in workers:
+            worker.join()
+    
+    wall_time = time.perf_counter() - started
+    for target in targets:
+        print(f"[{target.name}] {target.rows_written} rows in {target.batches_written} batches "
+              f"({target.batches_skipped} skipped), {target.rows_per_second:,.0f} rows/sec")
+    print(f"Loaded all targets in {wall_time:.1f}s")
+    
+    if errors:
+        failures = ', '.join(f"{name}: {error}" for name, error in errors.items())
+        raise RuntimeError(f"Bulk load failed ({failures}); rerun to resume from the last committed batch")
+    
+    return targets
@@ -0,0 +1,193 @@
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+SEASONS = {
+    12: 'Winter', 1: 'Winter', 2: 'Winter',
+    3: 'Spring', 4: 'Spring', 5: 'Spring',
+    6: 'Summer', 7: 'Summer', 8: 'Summer',
+    9: 'Fall', 10: 'Fall', 11: 'Fall'
+}
+
+SEASON_KEYS = ['fire_year', 'season', 'state']
+
+STATISTICS_COLUMNS = [
+    'year', 'season', 'state', 'total_fires', 'sized_fires', 'total_acres',
+    'avg_fire_size', 'max_fire_size', 'dominant_cause'
+]
+
+CAUSE_COUNTS_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS seasonal_cause_counts (
+    year INTEGER NOT NULL,
+    season ENUM('Spring', 'Summer', 'Fall', 'Winter') NOT NULL,
+    state VARCHAR(2) NOT NULL,
+    cause VARCHAR(100) NOT NULL,
+    fire_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (year, season, state, cause)
+)
+"""
+
+# replace: the batch holds complete totals for its keys (full re-migration, idempotent on rerun)
+# merge: the batch holds only new fires, which are added onto what is stored. MySQL applies the
+# assignments in order, so avg_fire_size is computed from the stored totals before they are bumped;
+# like replace, it averages over fires that have a size (sized_fires), not over every fire
+UPSERT_STATISTICS = {
+    'replace': """
+        INSERT INTO seasonal_statistics
+            (year, season, state, total_fires, sized_fires, total_acres, avg_fire_size, max_fire_size, dominant_cause, created_at)
+        VALUES (:year, :season, :state, :total_fires, :sized_fires, :total_acres, :avg_fire_size, :max_fire_size, :dominant_cause,
+                :created_at)
+        ON DUPLICATE KEY UPDATE
+            total_fires = VALUES(total_fires),
+            sized_fires = VALUES(sized_fires),
+            total_acres = VALUES(total_acres),
+            avg_fire_size = VALUES(avg_fire_size),
+            max_fire_size = VALUES(max_fire_size),
+            dominant_cause = VALUES(dominant_cause)
+    """,
+    'merge': """
+        INSERT INTO seasonal_statistics
+            (year, season, state, total_fires, sized_fires, total_acres, avg_fire_size, max_fire_size, dominant_cause, created_at)
+        VALUES (:year, :season, :state, :total_fires, :sized_fires, :total_acres, :avg_fire_size, :max_fire_size, :dominant_cause,
+                :created_at)
+        ON DUPLICATE KEY UPDATE
+            avg_fire_size = (total_acres + VALUES(total_acres)) / NULLIF(sized_fires + VALUES(sized_fires), 0),
+            max_fire_size = GREATEST(COALESCE(max_fire_size, 0), COALESCE(VALUES(max_fire_size), 0)),
+            total_fires = total_fires + VALUES(total_fires),
+            sized_fires = sized_fires + VALUES(sized_fires),
+            total_acres = total_acres + VALUES(total_acres)
+    """
+}
+
+UPSERT_CAUSE_COUNTS = {
+    'replace': """
+        INSERT INTO seasonal_cause_counts (year, season, state, cause, fire_count)
+        VALUES (:year, :season, :state, :cause, :fire_count)
+        ON DUPLICATE KEY UPDATE fire_count = VALUES(fire_count)
+    """,
+    'merge': """
+        INSERT INTO seasonal_cause_counts (year, season, state, cause, fire_count)
+        VALUES (:year, :season, :state, :cause, :fire_count)
+        ON DUPLICATE KEY UPDATE fire_count = fire_count + VALUES(fire_count)
+    """
+}
+
+class SeasonalAccumulator:
+    def __init__(self):
+        self.totals = None
+        self.causes = None
+        self.rows = 0
+    
+    def add(self, chunk):
+        keys = [
+            chunk['fire_year'].rename('fire_year'),
+            chunk['discovery_date'].dt.month.map(SEASONS).rename('season'),
+            chunk['state'].rename('state')
+        ]
+        totals = chunk.groupby(keys).agg(
+            total_fires=('id', 'size'),
+            sized_fires=('fire_size_acres', 'count'),
+            total_acres=('fire_size_acres', 'sum'),
+            max_fire_size=('fire_size_acres', 'max')
+        )
+        causes = chunk.groupby(keys + [chunk['cause_description'].rename('cause')]).size()
+        
+        self.merge(totals, causes)
+        self.rows += len(chunk)
+    
+    def merge(self, totals, causes):
+        if self.totals is not None:
+            totals = pd.concat([self.totals, totals]).groupby(level=SEASON_KEYS).agg({
+                'total_fires': 'sum', 'sized_fires': 'sum', 'total_acres': 'sum', 'max_fire_size': 'max'
+            })
+            causes = pd.concat([self.causes, causes]).groupby(level=SEASON_KEYS + ['cause']).sum()
+        self.totals = totals
+        self.causes = causes
+    
+    def track(self, batches):
+        for offset, chunk in batches:
+            self.add(chunk)
+            yield offset, chunk
+    
+    def cause_counts(self):
+        return self.causes.rename('fire_count').reset_index().rename(columns={'fire_year': 'year'})
+    
+    def dominant_causes(self):
+        causes = self.causes.rename('fires').reset_index().sort_values(
+            SEASON_KEYS + ['fires', 'cause'], ascending=[True, True, True, False, True]
+        )
+        return causes.drop_duplicates(SEASON_KEYS).set_index(SEASON_KEYS)['cause']
+    
+    def result(self):
+        grouped = self.totals.copy()
+        grouped['avg_fire_size'] = grouped['total_acres'] / grouped['sized_fires'].where(grouped['sized_fires'] > 0)
+        grouped['dominant_cause'] = self.dominant_causes().reindex(grouped.index).fillna('Unknown')
+        
+        grouped = grouped.reset_index().rename(columns={'fire_year': 'year'})
+        return grouped[STATISTICS_COLUMNS]
+
+def records(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+def stage_keys(conn, statistics):
+    conn.execute(text("""
+        CREATE TEMPORARY TABLE IF NOT EXISTS seasonal_touched_keys (
+            year INTEGER NOT NULL,
+            season VARCHAR(10) NOT NULL,
+            state VARCHAR(2) NOT NULL,
+            PRIMARY KEY (year, season, state)
+        )
+    """))
+    conn.execute(text("DELETE FROM seasonal_touched_keys"))
+    conn.execute(
+        text("INSERT INTO seasonal_touched_keys (year, season, state) VALUES (:year, :season, :state)"),
+        records(statistics[['year', 'season', 'state']])
+    )
+
+def refresh_dominant_causes(conn):
+    conn.execute(text("""
+        UPDATE seasonal_statistics s
+        JOIN (
+            SELECT c.year, c.season, c.state, c.cause,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY c.year, c.season, c.state
+                       ORDER BY c.fire_count DESC, c.cause
+                   ) AS cause_rank
+            FROM seasonal_cause_counts c
+            JOIN seasonal_touched_keys k
+              ON k.year = c.year AND k.season = c.season AND k.state = c.state
+        ) ranked
+          ON ranked.year = s.year AND ranked.season = s.season AND ranked.state = s.state
+         AND ranked.cause_rank = 1
+        SET s.dominant_cause = ranked.cause
+    """))
+
+def upsert_seasonal_stats(accumulator, mysql_engine, mode='replace'):
+    if mode not in UPSERT_STATISTICS:
+        raise ValueError(f"Unknown seasonal statistics mode: {mode}")
+    if accumulator.totals is None:
+        return 0
+    
+    statistics = accumulator.result()
+    statistics['created_at'] = datetime.utcnow()
+    cause_counts = accumulator.cause_counts()
+    
+    with mysql_engine.begin() as conn:
+        conn.execute(text(CAUSE_COUNTS_TABLE_DDL))
+        stage_keys(conn, statistics)
+        
+        if mode == 'replace':
+            conn.execute(text("""
+                DELETE c FROM seasonal_cause_counts c
+                JOIN seasonal_touched_keys k
+                  ON k.year = c.year AND k.season = c.season AND k.state = c.state
+            """))
+        
+        conn.execute(text(UPSERT_STATISTICS[mode]), records(statistics))
+        if len(cause_counts):
+            conn.execute(text(UPSERT_CAUSE_COUNTS[mode]), records(cause_counts))
+        refresh_dominant_causes(conn)
+    
+    return len(statistics)
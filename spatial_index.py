@@ -0,0 +1,76 @@
+import argparse
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+import dataset
+
+EARTH_RADIUS_KM = 6371.0088
+
+# In-process spatial index for the CSV analysis scripts. Points are stored as 3D unit
+# vectors, so a great-circle radius maps exactly onto a straight-line (chord) radius
+class SpatialIndex:
+    def __init__(self, latitude, longitude, leafsize=32):
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.tree = cKDTree(self.to_unit_vectors(self.latitude, self.longitude), leafsize=leafsize)
+    
+    @classmethod
+    def from_frame(cls, data, latitude='LATITUDE', longitude='LONGITUDE'):
+        return cls(data[latitude].values, data[longitude].values)
+    
+    @staticmethod
+    def to_unit_vectors(latitude, longitude):
+        lat = np.radians(np.atleast_1d(np.asarray(latitude, dtype=np.float64)))
+        lon = np.radians(np.atleast_1d(np.asarray(longitude, dtype=np.float64)))
+        cos_lat = np.cos(lat)
+        return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+    
+    @staticmethod
+    def chord_length(distance_km):
+        return 2 * np.sin(np.minimum(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+    
+    @staticmethod
+    def arc_length(chord):
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+    
+    def within_radius(self, latitude, longitude, radius_km):
+        center = self.to_unit_vectors(latitude, longitude)[0]
+        index = self.tree.query_ball_point(center, r=self.chord_length(radius_km))
+        return np.sort(np.asarray(index, dtype=np.int64))
+    
+    def count_within_radius(self, latitude, longitude, radius_km):
+        centers = self.to_unit_vectors(latitude, longitude)
+        return np.asarray(self.tree.query_ball_point(centers, r=self.chord_length(radius_km), return_length=True))
+    
+    def nearest(self, latitude, longitude, k=1):
+        chord, index = self.tree.query(self.to_unit_vectors(latitude, longitude), k=k)
+        return self.arc_length(chord), index
+    
+    def within_bbox(self, west, south, east, north):
+        in_latitude = (self.latitude >= south) & (self.latitude <= north)
+        if west <= east:
+            in_longitude = (self.longitude >= west) & (self.longitude <= east)
+        else:
+            in_longitude = (self.longitude >= west) | (self.longitude <= east)
+        return np.flatnonzero(in_latitude & in_longitude)
+
+def main():
+    parser = argparse.ArgumentParser(description='Fires within a radius of a point')
+    parser.add_argument('latitude', type=float)
+    parser.add_argument('longitude', type=float)
+    parser.add_argument('--radius-km', type=float, default=25.0)
+    parser.add_argument('--data', default='data/Fires_pruned.csv')
+    args = parser.parse_args()
+    
+    data = dataset.load(['LATITUDE', 'LONGITUDE', 'FIRE_YEAR', 'STATE', 'FIRE_SIZE', 'STAT_CAUSE_DESCR'], source=args.data)
+    data = data.dropna(subset=['LATITUDE', 'LONGITUDE']).reset_index(drop=True)
+    index = SpatialIndex.from_frame(data)
+    
+    nearby = data.iloc[index.within_radius(args.latitude, args.longitude, args.radius_km)]
+    print(f"{len(nearby)} fires within {args.radius_km} km of ({args.latitude}, {args.longitude})")
+    if len(nearby):
+        print(nearby[['FIRE_YEAR', 'STATE', 'FIRE_SIZE', 'STAT_CAUSE_DESCR']].describe(include='all'))
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,28 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import dataset
 
-# Load the data from the CSV file
-data = pd.read_csv("data/Fires_pruned.csv")
+COLUMNS = ["FIRE_YEAR", "FIRE_SIZE_CLASS", "OBJECTID"]
 
 # Group data by year and fire size class, count the number of fires
-fires_by_year_size = data.groupby(['FIRE_YEAR', 'FIRE_SIZE_CLASS'])['OBJECTID'].count().unstack().fillna(0)
+def fires_by_year_size(data):
+    return data.groupby(['FIRE_YEAR', 'FIRE_SIZE_CLASS'])['OBJECTID'].count().unstack().fillna(0)
 
-# Create a time series plot
-plt.figure(figsize=(12, 6))
-fires_by_year_size.plot(ax=plt.gca())
-plt.xlabel("Year")
-plt.ylabel("Number of Fires")
-plt.title("Time Series of Fires Over the Years by Size Class")
-plt.legend(title="Size Class")
+def plot_time_series_fires(fires_by_year_size, path="images/time_series_fires.png"):
+    # Create a time series plot
+    plt.figure(figsize=(12, 6))
+    fires_by_year_size.plot(ax=plt.gca())
+    plt.xlabel("Year")
+    plt.ylabel("Number of Fires")
+    plt.title("Time Series of Fires Over the Years by Size Class")
+    plt.legend(title="Size Class")
+    
+    # Save the image
+    plt.savefig(path)
 
-# Save the image
-plt.savefig("images/time_series_fires.png")
-
-# Show the plot
-plt.show()
+if __name__ == '__main__':
+    # Load the data from the Parquet cache of the CSV file
+    data = dataset.load(COLUMNS)
+    plot_time_series_fires(fires_by_year_size(data))
+    
+    # Show the plot
+    plt.show()